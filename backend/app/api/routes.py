@@ -1,7 +1,12 @@
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Depends
-from typing import List
-from datetime import datetime, timedelta
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Depends, BackgroundTasks, Query, Request
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import asyncio
+import httpx
 import logging
+import time
+import orjson
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.api_models import (
@@ -9,34 +14,132 @@ from app.models.api_models import (
     GetRepositoriesResponse, GetPullRequestsResponse,
     UnsubscribeRepositoryRequest, UnsubscribeRepositoryResponse,
     SubscribeTeamResponse, UnsubscribeTeamRequest, UnsubscribeTeamResponse,
-    GetTeamsResponse, GetTeamPullRequestsResponse, ErrorResponse
+    GetTeamsResponse, GetTeamPullRequestsResponse, GetTeamPullRequestSummariesResponse, ErrorResponse
 )
 from app.models.pr_models import (
     RepositorySubscription, RepositoryStats,
     TeamSubscriptionRequest, TeamSubscription, TeamStats, PullRequest
 )
-from app.services.github_service import GitHubService
+from app.services.github_service import GitHubService, get_github_service
 from app.services.websocket_manager import websocket_manager
-from app.services.scheduler import get_scheduler
+from app.services.scheduler import RefreshResult, get_scheduler
 from app.services.database_service import DatabaseService
 from app.services.token_service import token_service
-from app.database.database import get_db
+from app.services.http_client import get_client
+from app.database.database import get_db, AsyncSessionLocal
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+# orjson serializes the large PR listings several times faster than stdlib json
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
 # Health check endpoint for debugging
+# The serialized body is rebuilt at most once per second, so frequent probes just send cached bytes
+_health_body: bytes = b""
+_health_expires_at: float = 0.0
+
+
 @router.get("/health")
 async def health_check():
     """Simple health check endpoint"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "backend_running": True
-    }
+    global _health_body, _health_expires_at
+    now = time.monotonic()
+    if now >= _health_expires_at:
+        _health_body = orjson.dumps({
+            "status": "healthy",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "backend_running": True
+        })
+        _health_expires_at = now + 1.0
+    return Response(content=_health_body, media_type="application/json")
+
+
+# Static parts of the fake PRs sent by the test endpoints; only the timestamps change per call
+_FAKE_TEAM_NEEDS_REVIEW_PR = {
+    "id": 888888888,
+    "number": 8888,
+    "title": "🧪 TEST: Team PR that needs your review",
+    "body": "This is a test PR from a team repository for testing the needs review notification logic.",
+    "state": "open",
+    "html_url": "https://github.com/test-team-org/team-repo/pull/8888",
+    "closed_at": None,
+    "merged_at": None,
+    "user": {
+        "id": 54321,
+        "login": "team-member",
+        "avatar_url": "https://avatars.githubusercontent.com/u/54321?v=4",
+        "html_url": "https://github.com/team-member"
+    },
+    "assignees": [],
+    "requested_reviewers": [
+        {
+            "id": 11111,
+            "login": "current-user",  # This would be the actual user
+            "avatar_url": "https://avatars.githubusercontent.com/u/11111?v=4",
+            "html_url": "https://github.com/current-user"
+        }
+    ],
+    "requested_teams": [],
+    "reviews": [],
+    "repository": {
+        "id": 666666,
+        "name": "team-repo",
+        "full_name": "test-team-org/team-repo",
+        "html_url": "https://github.com/test-team-org/team-repo",
+        "description": "Team repository with important code",
+        "private": False
+    },
+    "draft": False,
+    "mergeable": True,
+    "status": "needs_review",  # This is the key field for testing
+    "user_has_reviewed": False,
+    "user_is_assigned": False,
+    "user_is_requested_reviewer": True  # User is requested to review
+}
+
+_FAKE_NEEDS_REVIEW_PR = {
+    "id": 999999999,
+    "number": 9999,
+    "title": "🧪 TEST: Fake PR that needs review",
+    "body": "This is a test PR created for testing the needs review notification logic.",
+    "state": "open",
+    "html_url": "https://github.com/test/repo/pull/9999",
+    "closed_at": None,
+    "merged_at": None,
+    "user": {
+        "id": 12345,
+        "login": "test-author",
+        "avatar_url": "https://avatars.githubusercontent.com/u/12345?v=4",
+        "html_url": "https://github.com/test-author"
+    },
+    "assignees": [],
+    "requested_reviewers": [
+        {
+            "id": 67890,
+            "login": "test-reviewer",
+            "avatar_url": "https://avatars.githubusercontent.com/u/67890?v=4",
+            "html_url": "https://github.com/test-reviewer"
+        }
+    ],
+    "requested_teams": [],
+    "reviews": [],
+    "repository": {
+        "id": 555555,
+        "name": "test-repo",
+        "full_name": "test-org/test-repo",
+        "html_url": "https://github.com/test-org/test-repo",
+        "description": "Test repository for PR notifications",
+        "private": False
+    },
+    "draft": False,
+    "mergeable": True,
+    "status": "needs_review",  # This is the key field for testing
+    "user_has_reviewed": False,
+    "user_is_assigned": False,
+    "user_is_requested_reviewer": True
+}
 
 
 # Test endpoint for creating fake needs review PRs from teams
@@ -44,70 +147,31 @@ async def health_check():
 async def create_fake_team_needs_review_pr():
     """Create a fake team PR with needs_review status for testing notifications"""
     try:
+        now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        
         # Create a fake PR that needs review from a team repository
-        fake_pr = {
-            "id": 888888888,
-            "number": 8888,
-            "title": "🧪 TEST: Team PR that needs your review",
-            "body": "This is a test PR from a team repository for testing the needs review notification logic.",
-            "state": "open",
-            "html_url": "https://github.com/test-team-org/team-repo/pull/8888",
-            "created_at": datetime.utcnow().isoformat() + "Z",
-            "updated_at": datetime.utcnow().isoformat() + "Z",
-            "closed_at": None,
-            "merged_at": None,
-            "user": {
-                "id": 54321,
-                "login": "team-member",
-                "avatar_url": "https://avatars.githubusercontent.com/u/54321?v=4",
-                "html_url": "https://github.com/team-member"
-            },
-            "assignees": [],
-            "requested_reviewers": [
-                {
-                    "id": 11111,
-                    "login": "current-user",  # This would be the actual user
-                    "avatar_url": "https://avatars.githubusercontent.com/u/11111?v=4",
-                    "html_url": "https://github.com/current-user"
-                }
-            ],
-            "requested_teams": [],
-            "reviews": [],
-            "repository": {
-                "id": 666666,
-                "name": "team-repo",
-                "full_name": "test-team-org/team-repo",
-                "html_url": "https://github.com/test-team-org/team-repo",
-                "description": "Team repository with important code",
-                "private": False
-            },
-            "draft": False,
-            "mergeable": True,
-            "status": "needs_review",  # This is the key field for testing
-            "user_has_reviewed": False,
-            "user_is_assigned": False,
-            "user_is_requested_reviewer": True  # User is requested to review
-        }
+        fake_pr = {**_FAKE_TEAM_NEEDS_REVIEW_PR, "created_at": now, "updated_at": now}
         
         # Send WebSocket notification to all connected users for testing
         # Debug: Check connected users and send simple message
         connected_users = websocket_manager.get_connected_users()
-        logger.info(f"Connected WebSocket users: {connected_users}")
+        logger.info("Connected WebSocket users: %s", connected_users)
         
         if not connected_users:
             logger.error("No WebSocket users connected!")
             
-        from app.models.pr_models import WebSocketMessage
-        message = WebSocketMessage(
-            type="team_pr_update",
-            data={
+        # Internally built message, so serialize it directly instead of validating a WebSocketMessage
+        payload = orjson.dumps({
+            "type": "team_pr_update",
+            "data": {
                 "team": "test-org/test-team",
                 "update_type": "new_pr",
                 "pull_request": fake_pr
-            }
-        )
-        logger.info(f"Broadcasting team PR update message to {len(connected_users)} users")
-        await websocket_manager.broadcast_to_all(message)
+            },
+            "timestamp": now
+        }).decode()
+        logger.info("Broadcasting team PR update message to %d users", len(connected_users))
+        await websocket_manager.broadcast_raw(payload)
         
         logger.info("Created fake team needs review PR for testing")
         
@@ -118,7 +182,7 @@ async def create_fake_team_needs_review_pr():
         }
         
     except Exception as e:
-        logger.error(f"Failed to create fake team needs review PR: {str(e)}")
+        logger.error("Failed to create fake team needs review PR: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to create test team PR: {str(e)}")
 
 
@@ -127,64 +191,23 @@ async def create_fake_team_needs_review_pr():
 async def create_fake_needs_review_pr():
     """Create a fake PR with needs_review status for testing notifications"""
     try:
+        now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        
         # Create a fake PR that needs review
-        fake_pr = {
-            "id": 999999999,
-            "number": 9999,
-            "title": "🧪 TEST: Fake PR that needs review",
-            "body": "This is a test PR created for testing the needs review notification logic.",
-            "state": "open",
-            "html_url": "https://github.com/test/repo/pull/9999",
-            "created_at": datetime.utcnow().isoformat() + "Z",
-            "updated_at": datetime.utcnow().isoformat() + "Z",
-            "closed_at": None,
-            "merged_at": None,
-            "user": {
-                "id": 12345,
-                "login": "test-author",
-                "avatar_url": "https://avatars.githubusercontent.com/u/12345?v=4",
-                "html_url": "https://github.com/test-author"
-            },
-            "assignees": [],
-            "requested_reviewers": [
-                {
-                    "id": 67890,
-                    "login": "test-reviewer",
-                    "avatar_url": "https://avatars.githubusercontent.com/u/67890?v=4",
-                    "html_url": "https://github.com/test-reviewer"
-                }
-            ],
-            "requested_teams": [],
-            "reviews": [],
-            "repository": {
-                "id": 555555,
-                "name": "test-repo",
-                "full_name": "test-org/test-repo",
-                "html_url": "https://github.com/test-org/test-repo",
-                "description": "Test repository for PR notifications",
-                "private": False
-            },
-            "draft": False,
-            "mergeable": True,
-            "status": "needs_review",  # This is the key field for testing
-            "user_has_reviewed": False,
-            "user_is_assigned": False,
-            "user_is_requested_reviewer": True
-        }
+        fake_pr = {**_FAKE_NEEDS_REVIEW_PR, "created_at": now, "updated_at": now}
         
         # Send WebSocket notification to all connected users for testing
         # This bypasses the subscription check to ensure notification is received
-        message = {
+        payload = orjson.dumps({
             "type": "pr_update",
             "data": {
                 "repository": "test-org/test-repo",
                 "update_type": "new_pr",
                 "pull_request": fake_pr
-            }
-        }
-        from app.models.pr_models import WebSocketMessage
-        ws_message = WebSocketMessage(**message)
-        await websocket_manager.broadcast_to_all(ws_message)
+            },
+            "timestamp": now
+        }).decode()
+        await websocket_manager.broadcast_raw(payload)
         
         logger.info("Created fake needs review PR for testing")
         
@@ -195,11 +218,33 @@ async def create_fake_needs_review_pr():
         }
         
     except Exception as e:
-        logger.error(f"Failed to create fake needs review PR: {str(e)}")
+        logger.error("Failed to create fake needs review PR: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to create test PR: {str(e)}")
 
 
 # Authentication endpoints
+
+# Single-flight state for /auth/validate: concurrent callers with the same token share one GitHub
+# round-trip. Holds (token, request task), so a request made with a replaced token is never joined
+_validate_inflight: Optional[Tuple[str, asyncio.Task]] = None
+_validate_lock = asyncio.Lock()
+
+
+async def _fetch_authenticated_user() -> Tuple[str, httpx.Response]:
+    """Fetch /user for the current token, joining a request for that token already in flight"""
+    global _validate_inflight
+    async with _validate_lock:
+        token = token_service.token
+        if _validate_inflight is None or _validate_inflight[1].done() or _validate_inflight[0] != token:
+            headers = token_service.get_auth_headers()
+            _validate_inflight = (token, asyncio.ensure_future(
+                get_client().get('https://api.github.com/user', headers=headers)
+            ))
+        inflight = _validate_inflight
+    # Shield so one caller disconnecting doesn't cancel the request for the others
+    return inflight[0], await asyncio.shield(inflight[1])
+
+
 @router.post("/auth/token")
 async def set_github_token(request: dict):
     """Set and validate GitHub token"""
@@ -233,7 +278,7 @@ async def set_github_token(request: dict):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error setting GitHub token: {e}")
+        logger.error("Error setting GitHub token: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -248,52 +293,73 @@ async def get_auth_status():
             "needs_revalidation": False  # Will be enhanced with periodic validation
         }
     except Exception as e:
-        logger.error(f"Error getting auth status: {e}")
+        logger.error("Error getting auth status: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/auth/validate")
-async def validate_github_token():
-    """Validate the current GitHub token"""
+async def validate_github_token(force: bool = False):
+    """Validate the current GitHub token, reusing a recent validation unless forced"""
     try:
         if not token_service.token:
             raise HTTPException(status_code=401, detail="No token set")
         
+        last_validated = token_service.last_validated
+        if (
+            not force
+            and token_service.is_token_valid
+            and token_service.user_info
+            and last_validated
+            and (datetime.now(timezone.utc) - last_validated).total_seconds() < settings.TOKEN_VALIDATION_TTL_SECONDS
+        ):
+            return {
+                "valid": True,
+                "user": token_service.user_info,
+                "last_validated": last_validated.isoformat(),
+                "cached": True
+            }
+        
         # Try to validate with GitHub API directly to get proper status codes
-        import aiohttp
-        headers = token_service.get_auth_headers()
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.get('https://api.github.com/user', headers=headers) as response:
-                if response.status == 200:
-                    # Token is valid
-                    user_data = await response.json()
-                    return {
-                        "valid": True,
-                        "user": user_data,
-                        "last_validated": token_service.last_validated.isoformat() if token_service.last_validated else None
-                    }
-                elif response.status == 401:
-                    # Token is actually invalid/expired
-                    return {
-                        "valid": False,
-                        "error": "Token is invalid or expired. Please update your GitHub token.",
-                        "user": None
-                    }
-                elif response.status == 403:
-                    # Rate limited - token is still valid but can't make requests
-                    raise HTTPException(
-                        status_code=403, 
-                        detail="GitHub API rate limit exceeded. Token is still valid but requests are temporarily limited."
-                    )
-                else:
-                    # Other error
-                    raise HTTPException(status_code=response.status, detail=f"GitHub API error: {response.status}")
+        token, response = await _fetch_authenticated_user()
+        # /auth/token may have switched tokens while the request was in flight; only record
+        # the result against the token it was made with
+        is_current_token = token == token_service.token
+        
+        if response.status_code == 200:
+            # Token is valid
+            user_data = response.json()
+            if is_current_token:
+                token_service.mark_validated(user_data)
+            return {
+                "valid": True,
+                "user": user_data,
+                "last_validated": token_service.last_validated.isoformat() if token_service.last_validated else None,
+                "cached": False
+            }
+        elif response.status_code == 401:
+            # Token is actually invalid/expired; don't let a cached success answer the next call
+            if is_current_token:
+                token_service.expire_validation()
+            return {
+                "valid": False,
+                "error": "Token is invalid or expired. Please update your GitHub token.",
+                "user": None,
+                "cached": False
+            }
+        elif response.status_code == 403:
+            # Rate limited - token is still valid but can't make requests
+            raise HTTPException(
+                status_code=403, 
+                detail="GitHub API rate limit exceeded. Token is still valid but requests are temporarily limited."
+            )
+        else:
+            # Other error
+            raise HTTPException(status_code=response.status_code, detail=f"GitHub API error: {response.status_code}")
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error validating GitHub token: {e}")
+        logger.error("Error validating GitHub token: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -313,7 +379,7 @@ async def clear_github_token():
             "message": "GitHub token cleared successfully"
         }
     except Exception as e:
-        logger.error(f"Error clearing GitHub token: {e}")
+        logger.error("Error clearing GitHub token: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -466,109 +532,154 @@ async def clear_github_token():
 async def websocket_endpoint(websocket: WebSocket, user_id: str):
     await websocket_manager.connect(websocket, user_id)
     try:
+        # Dead peers are detected by uvicorn's protocol-level ping frames (see run.py),
+        # which surface here as WebSocketDisconnect
         while True:
-            # Use asyncio.wait_for with timeout to handle potential disconnections
-            import asyncio
-            try:
-                # Wait for message with 30 second timeout
-                data = await asyncio.wait_for(websocket.receive_text(), timeout=30.0)
-                # Handle incoming WebSocket messages if needed
-                logger.debug(f"Received message from {user_id}: {data}")
-                
-                # Respond to ping messages to keep connection alive
-                if data.strip().lower() in ['ping', 'heartbeat']:
-                    await websocket.send_text('pong')
-                    
-            except asyncio.TimeoutError:
-                # Send ping to check if connection is still alive
+            data = await websocket.receive_text()
+            
+            # Respond to the frontend's application-level pings
+            if data.strip().lower() in ('ping', 'heartbeat'):
+                # Through the manager, so this socket only ever has one writer
+                websocket_manager.send_text(user_id, 'pong')
+            elif data.startswith('{'):
+                # Team room membership: {"sub": "org/team"} or {"unsub": "org/team"}
                 try:
-                    await websocket.send_text('ping')
-                except:
-                    # Connection is dead, break the loop
-                    break
+                    command = orjson.loads(data)
+                except orjson.JSONDecodeError:
+                    command = None
+                if not isinstance(command, dict):
+                    logger.debug("Ignoring malformed WebSocket message from %s", user_id)
+                    continue
+                if command.get("sub"):
+                    websocket_manager.subscribe_to_team(user_id, command["sub"])
+                if command.get("unsub"):
+                    websocket_manager.unsubscribe_from_team(user_id, command["unsub"])
     except WebSocketDisconnect:
-        logger.info(f"WebSocket disconnected for user {user_id}")
-        websocket_manager.disconnect(user_id)
+        logger.info("WebSocket disconnected for user %s", user_id)
     except Exception as e:
-        logger.error(f"WebSocket error for user {user_id}: {e}")
-        websocket_manager.disconnect(user_id)
+        # Don't leave a half-broken socket open; the client will reconnect
+        logger.error("WebSocket error for user %s: %s", user_id, e)
+        try:
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+    finally:
+        # A reconnect under the same user_id may already have replaced this socket; leave the new one alone
+        if websocket_manager.active_connections.get(user_id) is websocket:
+            websocket_manager.disconnect(user_id)
 
 
 # Team API Endpoints
+def _not_subscribed_to_team(team_key: str) -> HTTPException:
+    """Build the 404 raised when a team endpoint is called for a team we don't watch"""
+    return HTTPException(status_code=404, detail=f"Not subscribed to team '{team_key}'")
+
+
+async def subscribed_team_key(organization: str, team_name: str) -> str:
+    """Dependency resolving the team key from the path, 404ing if the team isn't subscribed"""
+    # async so FastAPI runs it inline rather than in the threadpool
+    team_key = f"{organization}/{team_name}"
+    if not get_scheduler().is_team_subscribed(team_key):
+        raise _not_subscribed_to_team(team_key)
+    return team_key
+
+
+# Distinguishes this process's ETags from a previous run's, since pr_data_version restarts at zero
+_ETAG_EPOCH = f"{time.time_ns():x}"
+
+
+async def pr_data_etag(request: Request, response: Response) -> str:
+    """
+    Dependency tagging PR listings with the scheduler's data version, answering 304
+    when the client's If-None-Match already carries it.
+    
+    The version changes whenever stored PRs or the subscribed teams change, so one
+    tag covers every listing; clients cache per URL. Handlers that return their own
+    Response must copy the returned tag onto it.
+    """
+    etag = f'W/"{_ETAG_EPOCH}-{get_scheduler().pr_data_version}"'
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        raise HTTPException(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return etag
+
+
 @router.post("/teams/subscribe", response_model=SubscribeTeamResponse)
-async def subscribe_to_team(request: TeamSubscriptionRequest):
+async def subscribe_to_team(
+    request: TeamSubscriptionRequest,
+    background_tasks: BackgroundTasks,
+    github_service: GitHubService = Depends(get_github_service),
+    db: AsyncSession = Depends(get_db)
+):
     """Subscribe to a GitHub team to monitor their pull requests"""
     try:
-        async with GitHubService() as github_service:
-            # Verify team exists and is accessible
-            team_info = await github_service.get_team_info(request.organization, request.team_name)
-            if not team_info:
-                raise HTTPException(
-                    status_code=404, 
-                    detail=f"Team '{request.organization}/{request.team_name}' not found or not accessible"
-                )
-            
-            # Check if we can access team members
-            members = await github_service.get_team_members(request.organization, request.team_name)
-            if not members:
-                raise HTTPException(
-                    status_code=403,
-                    detail=f"Cannot access members of team '{request.organization}/{request.team_name}'. Check permissions."
-                )
-            
-            subscription = TeamSubscription(
-                organization=request.organization,
-                team_name=request.team_name,
-                watch_all_prs=request.watch_all_prs,
-                watch_assigned_prs=request.watch_assigned_prs,
-                watch_review_requests=request.watch_review_requests
+        # Verify team exists and that we can access its members (independent lookups, run together)
+        team_info, members = await asyncio.gather(
+            github_service.get_team_info(request.organization, request.team_name),
+            github_service.get_team_members(request.organization, request.team_name)
+        )
+        if not team_info:
+            raise HTTPException(
+                status_code=404, 
+                detail=f"Team '{request.organization}/{request.team_name}' not found or not accessible"
             )
-            
-            # Store subscription in database
-            async for db in get_db():
-                db_service = DatabaseService(db)
-                await db_service.create_team_subscription(request)
-                break
-            
-            # Add to scheduler for real-time monitoring
-            scheduler = get_scheduler()
-            scheduler.add_team_subscription(subscription)
-            
-            return SubscribeTeamResponse(
-                success=True,
-                message=f"Successfully subscribed to team '{request.organization}/{request.team_name}'",
-                subscription=subscription
+        
+        if not members:
+            raise HTTPException(
+                status_code=403,
+                detail=f"Cannot access members of team '{request.organization}/{request.team_name}'. Check permissions."
             )
+        
+        subscription = TeamSubscription(
+            organization=request.organization,
+            team_name=request.team_name,
+            watch_all_prs=request.watch_all_prs,
+            watch_assigned_prs=request.watch_assigned_prs,
+            watch_review_requests=request.watch_review_requests
+        )
+        
+        # Store subscription in database
+        db_service = DatabaseService(db)
+        await db_service.create_team_subscription(request)
+        
+        # Add to scheduler for real-time monitoring
+        scheduler = get_scheduler()
+        scheduler.add_team_subscription(subscription)
+        
+        # Fetch the team's PRs after responding; results are pushed over the WebSocket
+        background_tasks.add_task(scheduler.force_refresh_team, request.organization, request.team_name)
+        
+        return SubscribeTeamResponse(
+            success=True,
+            message=f"Successfully subscribed to team '{request.organization}/{request.team_name}'",
+            subscription=subscription
+        )
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error subscribing to team {request.organization}/{request.team_name}: {e}")
+        logger.error("Error subscribing to team %s/%s: %s", request.organization, request.team_name, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/teams/unsubscribe", response_model=UnsubscribeTeamResponse)
-async def unsubscribe_from_team(request: UnsubscribeTeamRequest):
+async def unsubscribe_from_team(request: UnsubscribeTeamRequest, db: AsyncSession = Depends(get_db)):
     """Unsubscribe from a GitHub team"""
     try:
-        # Remove from scheduler
         scheduler = get_scheduler()
         team_key = f"{request.organization}/{request.team_name}"
-        if team_key not in scheduler.get_subscribed_teams():
-            raise HTTPException(
-                status_code=404,
-                detail=f"Not subscribed to team '{request.organization}/{request.team_name}'"
-            )
+        if not scheduler.is_team_subscribed(team_key):
+            raise _not_subscribed_to_team(team_key)
         
-        scheduler.remove_team_subscription(request.organization, request.team_name)
+        # Remove from database first, so a failed write leaves the scheduler still polling the team
+        db_service = DatabaseService(db)
+        success = await db_service.delete_team_subscription(request.organization, request.team_name)
+        if not success:
+            logger.warning("Team subscription not found in database: %s", team_key)
         
-        # Remove from database
-        async for db in get_db():
-            db_service = DatabaseService(db)
-            success = await db_service.delete_team_subscription(request.organization, request.team_name)
-            if not success:
-                logger.warning(f"Team subscription not found in database: {team_key}")
-            break
+        # Remove from scheduler
+        scheduler.remove_team_subscription(request.organization, request.team_name)
         
         return UnsubscribeTeamResponse(
             success=True,
@@ -578,20 +689,18 @@ async def unsubscribe_from_team(request: UnsubscribeTeamRequest):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error unsubscribing from team {request.organization}/{request.team_name}: {e}")
+        logger.error("Error unsubscribing from team %s/%s: %s", request.organization, request.team_name, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/teams", response_model=GetTeamsResponse)
-async def get_subscribed_teams():
+async def get_subscribed_teams(db: AsyncSession = Depends(get_db)):
     """Get all subscribed teams with their statistics"""
     try:
         # Get team stats from database (updated by scheduler)
         teams = []
-        async for db in get_db():
-            db_service = DatabaseService(db)
-            teams = await db_service.get_all_team_stats()
-            break
+        db_service = DatabaseService(db)
+        teams = await db_service.get_all_team_stats()
         
         return GetTeamsResponse(
             teams=teams,
@@ -599,7 +708,7 @@ async def get_subscribed_teams():
         )
     
     except Exception as e:
-        logger.error(f"Error getting subscribed teams: {e}")
+        logger.error("Error getting subscribed teams: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -616,16 +725,15 @@ async def auto_subscribe_to_user_teams():
         }
     
     except Exception as e:
-        logger.error(f"Error auto-subscribing to user teams: {e}")
+        logger.error("Error auto-subscribing to user teams: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/teams/available")
-async def get_available_teams():
+async def get_available_teams(github_service: GitHubService = Depends(get_github_service)):
     """Get teams the user belongs to but hasn't subscribed to yet"""
     try:
-        async with GitHubService() as github_service:
-            user_teams = await github_service.get_current_user_teams()
+        user_teams = await github_service.get_current_user_teams()
         
         scheduler = get_scheduler()
         subscribed_teams = scheduler.get_subscribed_teams()
@@ -648,17 +756,18 @@ async def get_available_teams():
         }
     
     except Exception as e:
-        logger.error(f"Error getting available teams: {e}")
+        logger.error("Error getting available teams: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/user/info")
-async def get_user_info():
+async def get_user_info(github_service: GitHubService = Depends(get_github_service)):
     """Get current user information and team memberships"""
     try:
-        async with GitHubService() as github_service:
-            current_user = await github_service.get_current_user()
-            user_teams = await github_service.get_current_user_teams()
+        current_user, user_teams = await asyncio.gather(
+            github_service.get_current_user(),
+            github_service.get_current_user_teams()
+        )
         
         scheduler = get_scheduler()
         subscribed_teams = scheduler.get_subscribed_teams()
@@ -666,41 +775,38 @@ async def get_user_info():
         return {
             "user": current_user.model_dump() if current_user else None,
             "teams": user_teams,
-            "subscribed_teams": subscribed_teams,
+            "subscribed_teams": sorted(subscribed_teams),
             "auto_subscribe_enabled": settings.AUTO_SUBSCRIBE_USER_TEAMS
         }
     
     except Exception as e:
-        logger.error(f"Error getting user info: {e}")
+        logger.error("Error getting user info: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/teams/{organization}/{team_name}/enable")
-async def enable_team_subscription(organization: str, team_name: str):
+async def enable_team_subscription(organization: str, team_name: str, db: AsyncSession = Depends(get_db)):
     """Enable a team subscription"""
     try:
-        # Check if team subscription exists
+        # Check if team subscription exists, keeping it to update after the database write
         team_key = f"{organization}/{team_name}"
-        scheduler = get_scheduler()
-        if team_key not in scheduler.get_subscribed_teams():
+        subscription = get_scheduler().get_team_subscription(team_key)
+        if subscription is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"Team subscription '{organization}/{team_name}' not found"
             )
         
         # Enable in database
-        async for db in get_db():
-            db_service = DatabaseService(db)
-            success = await db_service.enable_team_subscription(organization, team_name)
-            if not success:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Team subscription '{organization}/{team_name}' not found in database"
-                )
-            break
+        db_service = DatabaseService(db)
+        success = await db_service.enable_team_subscription(organization, team_name)
+        if not success:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Team subscription '{organization}/{team_name}' not found in database"
+            )
         
         # Update scheduler
-        subscription = scheduler.subscribed_teams[team_key]
         subscription.enabled = True
         
         return {
@@ -711,36 +817,33 @@ async def enable_team_subscription(organization: str, team_name: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error enabling team subscription {organization}/{team_name}: {e}")
+        logger.error("Error enabling team subscription %s/%s: %s", organization, team_name, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/teams/{organization}/{team_name}/disable")
-async def disable_team_subscription(organization: str, team_name: str):
+async def disable_team_subscription(organization: str, team_name: str, db: AsyncSession = Depends(get_db)):
     """Disable a team subscription"""
     try:
-        # Check if team subscription exists
+        # Check if team subscription exists, keeping it to update after the database write
         team_key = f"{organization}/{team_name}"
-        scheduler = get_scheduler()
-        if team_key not in scheduler.get_subscribed_teams():
+        subscription = get_scheduler().get_team_subscription(team_key)
+        if subscription is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"Team subscription '{organization}/{team_name}' not found"
             )
         
         # Disable in database
-        async for db in get_db():
-            db_service = DatabaseService(db)
-            success = await db_service.disable_team_subscription(organization, team_name)
-            if not success:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Team subscription '{organization}/{team_name}' not found in database"
-                )
-            break
+        db_service = DatabaseService(db)
+        success = await db_service.disable_team_subscription(organization, team_name)
+        if not success:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Team subscription '{organization}/{team_name}' not found in database"
+            )
         
         # Update scheduler
-        subscription = scheduler.subscribed_teams[team_key]
         subscription.enabled = False
         
         return {
@@ -751,80 +854,147 @@ async def disable_team_subscription(organization: str, team_name: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error disabling team subscription {organization}/{team_name}: {e}")
+        logger.error("Error disabling team subscription %s/%s: %s", organization, team_name, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Last database listing per team, as (scheduler pr_data_version, PR JSON array, PR count)
+_team_prs_cache: Dict[str, Tuple[int, bytes, int]] = {}
+
+
+def _team_prs_response(
+    prs_json: bytes, total_count: int, organization: str, team_name: str, etag: str,
+    next_cursor: Optional[str] = None
+) -> Response:
+    """Build a GetTeamPullRequestsResponse body around an already-serialized PR list"""
+    tail = orjson.dumps({
+        "organization": organization,
+        "team_name": team_name,
+        "total_count": total_count,
+        "next_cursor": next_cursor
+    })
+    body = b'{"pull_requests":' + prs_json + b"," + tail[1:]
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
 @router.get("/teams/{organization}/{team_name}/pull-requests", response_model=GetTeamPullRequestsResponse)
 async def get_team_pull_requests(
     organization: str, 
     team_name: str,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = None,
+    team_key: str = Depends(subscribed_team_key),
+    etag: str = Depends(pr_data_etag),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all pull requests for a specific team"""
+    """Get pull requests for a specific team; all of them, or one page when limit/cursor is given"""
     try:
         scheduler = get_scheduler()
-        team_key = f"{organization}/{team_name}"
-        
-        # Check if subscribed to this team
-        if team_key not in scheduler.get_subscribed_teams():
-            raise HTTPException(
-                status_code=404,
-                detail=f"Not subscribed to team '{organization}/{team_name}'"
-            )
         
-        # Read PRs from database
+        if limit is not None or cursor is not None:
+            db_service = DatabaseService(db)
+            try:
+                pr_jsons, next_cursor = await db_service.get_team_pull_requests_page(team_key, limit or 50, cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            
+            # total_count means the team's full count here too, not the size of this page
+            total_count = await db_service.count_team_pull_requests(team_key)
+            
+            prs_json = b"[" + ",".join(pr_jsons).encode() + b"]"
+            return _team_prs_response(prs_json, total_count, organization, team_name, etag, next_cursor)
+        
+        # Reuse the listing built from the database until stored PRs change
+        data_version = scheduler.pr_data_version
+        cached = _team_prs_cache.get(team_key)
+        if cached and cached[0] == data_version:
+            logger.info("Returning %d cached PRs for team %s", cached[2], team_key)
+            return _team_prs_response(cached[1], cached[2], organization, team_name, etag)
+        
+        # Stored rows are already PR JSON, so splice them into the body instead of
+        # decoding and re-validating every PR against the response model
         db_service = DatabaseService(db)
-        pr_dicts = await db_service.get_team_pull_requests(team_key)
+        pr_jsons = await db_service.get_team_pull_requests_json(team_key)
         
-        # Convert dicts back to PullRequest models
-        prs = [PullRequest(**pr_dict) for pr_dict in pr_dicts]
-        
-        logger.info(f"Returning {len(prs)} PRs from database for team {team_key}")
-        
-        return GetTeamPullRequestsResponse(
-            pull_requests=prs,
-            organization=organization,
-            team_name=team_name,
-            total_count=len(prs)
-        )
+        logger.info("Returning %d PRs from database for team %s", len(pr_jsons), team_key)
+        prs_json = b"[" + ",".join(pr_jsons).encode() + b"]"
+        _team_prs_cache[team_key] = (data_version, prs_json, len(pr_jsons))
+        return _team_prs_response(prs_json, len(pr_jsons), organization, team_name, etag)
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting pull requests for team {organization}/{team_name}: {e}")
+        logger.error("Error getting pull requests for team %s/%s: %s", organization, team_name, e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/teams/{organization}/{team_name}/pull-requests/summary", response_model=GetTeamPullRequestSummariesResponse)
+async def get_team_pull_request_summaries(
+    organization: str,
+    team_name: str,
+    team_key: str = Depends(subscribed_team_key),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a lightweight listing of a team's pull requests, without the full stored PR data"""
+    try:
+        db_service = DatabaseService(db)
+        summaries = await db_service.get_team_pull_request_summaries(team_key)
+        
+        return {
+            "pull_requests": summaries,
+            "organization": organization,
+            "team_name": team_name,
+            "total_count": len(summaries)
+        }
+    
+    except Exception as e:
+        logger.error("Error getting pull request summaries for team %s/%s: %s", organization, team_name, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/teams/{organization}/{team_name}/refresh")
+@router.get("/teams/{organization}/{team_name}/pull-requests/stream")
+async def stream_team_pull_requests(team_key: str = Depends(subscribed_team_key)):
+    """Stream a team's pull requests as NDJSON, one PR per line, straight from the database"""
+    async def generate_lines():
+        # The session must outlive the handler, so it is owned by the generator
+        async with AsyncSessionLocal() as db:
+            db_service = DatabaseService(db)
+            async for pr_json in db_service.stream_team_pull_requests(team_key):
+                yield pr_json + "\n"
+    
+    return StreamingResponse(generate_lines(), media_type="application/x-ndjson")
+
+
+@router.post("/teams/{organization}/{team_name}/refresh", status_code=202)
 async def refresh_team(organization: str, team_name: str):
     """Force refresh team pull requests"""
     try:
-        # Check if subscribed and refresh
         scheduler = get_scheduler()
-        team_key = f"{organization}/{team_name}"
-        if team_key not in scheduler.get_subscribed_teams():
+        
+        # Refresh runs in the background; updates arrive over the WebSocket
+        result = scheduler.request_team_refresh(organization, team_name)
+        if result is RefreshResult.NOT_SUBSCRIBED:
+            raise _not_subscribed_to_team(f"{organization}/{team_name}")
+        if result is RefreshResult.DISABLED:
             raise HTTPException(
-                status_code=404,
-                detail=f"Not subscribed to team '{organization}/{team_name}'"
+                status_code=409,
+                detail=f"Team subscription '{organization}/{team_name}' is disabled"
             )
         
-        await scheduler.force_refresh_team(organization, team_name)
-        
         return {
             "success": True, 
-            "message": f"Team '{organization}/{team_name}' refreshed successfully"
+            "message": f"Team '{organization}/{team_name}' refresh started"
         }
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error refreshing team {organization}/{team_name}: {e}")
+        logger.error("Error refreshing team %s/%s: %s", organization, team_name, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/users/me/pull-requests")
-async def get_user_relevant_pull_requests():
+async def get_user_relevant_pull_requests(etag: str = Depends(pr_data_etag), db: AsyncSession = Depends(get_db)):
     """Get all pull requests relevant to the current user (assigned, review requested, etc.)"""
     try:
         scheduler = get_scheduler()
@@ -835,32 +1005,19 @@ async def get_user_relevant_pull_requests():
         if not subscribed_teams:
             return {"pull_requests": []}
         
-        # Get user-relevant PRs from database
-        async for db in get_db():
-            db_service = DatabaseService(db)
-            user_prs = await db_service.get_user_relevant_pull_requests(
-                subscribed_repos=[],  # repositories removed - teams only
-                subscribed_teams=subscribed_teams
-            )
-            break
-        
-        # Additional filtering for status-based conditions (needs_review && !user_has_reviewed)
-        # This is done here since user_has_reviewed isn't consistently stored in the database
-        filtered_prs = []
-        for pr in user_prs:
-            # Always include assigned PRs and review requests
-            if pr.get('user_is_assigned') or pr.get('user_is_requested_reviewer'):
-                filtered_prs.append(pr)
-            # Include PRs that need review and user hasn't reviewed
-            elif pr.get('status') == 'needs_review' and not pr.get('user_has_reviewed'):
-                filtered_prs.append(pr)
-        
-        logger.info(f"Retrieved {len(filtered_prs)} user-relevant PRs from {len(subscribed_teams)} teams")
+        # Get user-relevant PRs from database (assigned, review requested, or needing the user's review)
+        db_service = DatabaseService(db)
+        user_prs = await db_service.get_user_relevant_pull_requests(
+            subscribed_repos=[],  # repositories removed - teams only
+            subscribed_teams=subscribed_teams
+        )
+        
+        logger.info("Retrieved %d user-relevant PRs from %d teams", len(user_prs), len(subscribed_teams))
         logger.debug("About to prepare response object")
         
         return {
-            "pull_requests": filtered_prs,
-            "total_count": len(filtered_prs),
+            "pull_requests": user_prs,
+            "total_count": len(user_prs),
             "sources": {
                 "repositories": 0,  # repositories removed - teams only
                 "teams": len(subscribed_teams)
@@ -868,12 +1025,20 @@ async def get_user_relevant_pull_requests():
         }
     
     except Exception as e:
-        logger.error(f"Error getting user relevant pull requests: {e}")
+        logger.error("Error getting user relevant pull requests: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Last /teams/repositories result per include_prs value, as (scheduler pr_data_version, monotonic time, response)
+_team_repositories_cache: Dict[bool, Tuple[int, float, dict]] = {}
+
+
 @router.get("/teams/repositories")
-async def get_team_repositories():
+async def get_team_repositories(
+    include_prs: bool = False,
+    etag: str = Depends(pr_data_etag),
+    db: AsyncSession = Depends(get_db)
+):
     """Get repository information discovered from team PRs for dynamic node creation"""
     try:
         scheduler = get_scheduler()
@@ -882,59 +1047,43 @@ async def get_team_repositories():
         if not subscribed_teams:
             return {"repositories": [], "total_count": 0}
         
-        # Collect repository information from all team PRs
-        repositories = {}
+        # Reuse the aggregation until the scheduler stores new PR data or the TTL lapses
+        data_version = scheduler.pr_data_version
+        cached = _team_repositories_cache.get(include_prs)
+        if (
+            cached
+            and cached[0] == data_version
+            and time.monotonic() - cached[1] < settings.POLLING_INTERVAL_SECONDS
+        ):
+            return cached[2]
         
-        async for db in get_db():
-            db_service = DatabaseService(db)
-            
-            for team_key in subscribed_teams:
-                try:
-                    # Get PRs for this team
-                    pr_dicts = await db_service.get_team_pull_requests(team_key)
-                    
-                    for pr_dict in pr_dicts:
-                        repo_name = pr_dict.get('repository', {}).get('full_name')
-                        if repo_name:
-                            if repo_name not in repositories:
-                                repositories[repo_name] = {
-                                    "repository_name": repo_name,
-                                    "repository": pr_dict.get('repository', {}),
-                                    "total_open_prs": 0,
-                                    "assigned_to_user": 0,
-                                    "review_requests": 0,
-                                    "from_teams": set(),
-                                    "prs": []
-                                }
-                            
-                            # Count PR stats
-                            repo_info = repositories[repo_name]
-                            repo_info["total_open_prs"] += 1
-                            repo_info["from_teams"].add(team_key)
-                            repo_info["prs"].append(pr_dict)
-                            
-                            if pr_dict.get('user_is_assigned'):
-                                repo_info["assigned_to_user"] += 1
-                            if pr_dict.get('user_is_requested_reviewer'):
-                                repo_info["review_requests"] += 1
-                
-                except Exception as e:
-                    logger.error(f"Error processing team {team_key} for repository discovery: {e}")
-                    continue
-            
-            break
+        db_service = DatabaseService(db)
+        # Counts and team membership are aggregated by the database, one row per repository
+        repositories = {
+            stats["repository_name"]: stats
+            for stats in await db_service.get_team_repository_stats(subscribed_teams)
+        }
         
-        # Convert sets to lists for JSON serialization
-        for repo_info in repositories.values():
-            repo_info["from_teams"] = list(repo_info["from_teams"])
+        # Full PR JSON is most of the payload and node creation doesn't need it, so it is opt-in
+        if include_prs:
+            for repo_info in repositories.values():
+                repo_info["prs"] = []
+            team_prs = await db_service.get_pull_requests_for_teams(subscribed_teams)
+            for pr_dicts in team_prs.values():
+                for pr_dict in pr_dicts:
+                    repo_info = repositories.get(pr_dict.get('repository', {}).get('full_name'))
+                    if repo_info is not None:
+                        repo_info["prs"].append(pr_dict)
         
-        logger.info(f"Found {len(repositories)} repositories from {len(subscribed_teams)} teams")
+        logger.info("Found %d repositories from %d teams", len(repositories), len(subscribed_teams))
         
-        return {
+        result = {
             "repositories": list(repositories.values()),
             "total_count": len(repositories)
         }
+        _team_repositories_cache[include_prs] = (data_version, time.monotonic(), result)
+        return result
     
     except Exception as e:
-        logger.error(f"Error getting team repositories: {e}")
+        logger.error("Error getting team repositories: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -23,9 +23,14 @@ class Settings(BaseSettings):
     
     GITHUB_API_BASE_URL: str = "https://api.github.com"
     POLLING_INTERVAL_SECONDS: int = 60
+    GITHUB_CACHE_TTL_SECONDS: int = 60  # PR lists
+    GITHUB_METADATA_CACHE_TTL_SECONDS: int = 900  # Users and repositories
+    GITHUB_MAX_CONCURRENCY: int = 10  # Concurrent per-item GitHub requests
+    TOKEN_VALIDATION_TTL_SECONDS: int = 60  # Reuse a recent /auth/validate result
     AUTO_SUBSCRIBE_USER_TEAMS: bool = True
     
-    ALLOWED_ORIGINS: List[str] = ["*"]
+    ALLOWED_ORIGINS: List[str] = ["*"]  # The packaged Electron app loads from file://, so no fixed origin
+    CORS_MAX_AGE_SECONDS: int = 86400  # Browsers reuse a preflight result this long (capped by the browser)
     
     DATABASE_URL: str = get_database_path()
     
@@ -1,24 +1,119 @@
-from sqlalchemy import create_engine
+from sqlalchemy import and_, create_engine, event, func, inspect, select, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+import orjson
 from app.core.config import settings
 
 # Create async engine for database operations
 engine = create_async_engine(
     settings.DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://"),
-    echo=False,
-    future=True
+    echo=settings.LOG_LEVEL.upper() == "DEBUG",  # SQL statement logging only when debugging
+    future=True,
+    # Sized so bursts of concurrent requests and scheduler polls don't queue on the pool
+    pool_size=20,
+    max_overflow=20,
+    pool_timeout=30,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    # JSON columns go through orjson rather than the stdlib json module
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads
 )
 
-# Create async session factory
-AsyncSessionLocal = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets API reads proceed while the scheduler is writing; NORMAL sync is safe under WAL
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+# Create async session factory; writers flush explicitly where they need ids before commit
+AsyncSessionLocal = async_sessionmaker(
+    engine, expire_on_commit=False, autoflush=False
 )
 
 # Base class for database models
 Base = declarative_base()
 
+
+def add_missing_columns(connection):
+    """Add nullable columns added to models after their table already existed; create_all skips existing tables"""
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                column_type = column.type.compile(dialect=connection.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
+
+# Unique indexes added after their tables may already hold duplicate rows (written before the
+# constraint existed); those duplicates are dropped before the index is built
+LATE_UNIQUE_INDEXES = ("ux_team_stats_team", "ux_team_sub_team", "ux_pr_repo_number")
+
+
+def drop_duplicate_rows(connection):
+    """Keep only the oldest row per key of each late unique index, so creating the index can't fail"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in LATE_UNIQUE_INDEXES:
+                keep = select(func.min(table.c.id)).group_by(*index.columns)
+                duplicates = select(table.c.id).where(table.c.id.notin_(keep))
+                _repoint_references(connection, table, index, duplicates)
+                connection.execute(table.delete().where(table.c.id.in_(duplicates)))
+
+
+def _repoint_references(connection, table, index, duplicates):
+    """Move rows referencing a duplicate onto the kept row; SQLite doesn't enforce the FK cascade"""
+    duplicate, kept = table.alias(), table.alias()
+    for child in Base.metadata.sorted_tables:
+        for foreign_key in child.foreign_keys:
+            if foreign_key.column is not table.c.id:
+                continue
+            column = foreign_key.parent
+            kept_id = (
+                select(func.min(kept.c.id))
+                .select_from(duplicate.join(kept, and_(*(kept.c[c.name] == duplicate.c[c.name] for c in index.columns))))
+                .where(duplicate.c.id == column)
+                .scalar_subquery()
+            )
+            # OR IGNORE skips links the kept row already has; those are deleted with the rest below
+            connection.execute(
+                child.update().prefix_with("OR IGNORE").where(column.in_(duplicates)).values({column.name: kept_id})
+            )
+            connection.execute(child.delete().where(column.in_(duplicates)))
+
+
+def create_missing_indexes(connection):
+    """Create indexes added to models after their table already existed; create_all skips existing tables"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def backfill_team_associations(connection):
+    """Copy team links from the legacy associated_teams column into pr_team_associations, once"""
+    associations = Base.metadata.tables["pr_team_associations"]
+    pull_requests = Base.metadata.tables["pull_requests"]
+    if connection.execute(select(associations.c.id).limit(1)).first() is not None:
+        return
+    
+    rows = connection.execute(
+        select(pull_requests.c.id, pull_requests.c.associated_teams)
+        .where(pull_requests.c.associated_teams.isnot(None))
+    )
+    links = [
+        {"pr_id": pr_id, "team_key": team_key}
+        for pr_id, associated_teams in rows
+        for team_key in set(associated_teams.split(','))
+        if team_key
+    ]
+    if links:
+        connection.execute(associations.insert(), links)
+
 # Dependency to get database session
 async def get_db():
     async with AsyncSessionLocal() as session:
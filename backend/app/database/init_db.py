@@ -10,7 +10,7 @@ async def init_database():
     # Create async engine
     engine = create_async_engine(
         settings.DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://"),
-        echo=True,
+        echo=settings.LOG_LEVEL.upper() == "DEBUG",
         future=True
     )
     
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON, Index, ForeignKey, UniqueConstraint
 from sqlalchemy.sql import func
 from app.database.database import Base
 from typing import List, Optional
@@ -33,7 +33,9 @@ class TeamSubscription(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Ensure unique team per organization
-    __table_args__ = ()
+    __table_args__ = (
+        Index("ux_team_sub_team", "organization", "team_name", unique=True),
+    )
 
 
 class TeamStats(Base):
@@ -47,8 +49,10 @@ class TeamStats(Base):
     review_requests = Column(Integer, default=0)
     last_updated = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
-    # Ensure unique stats per team
-    __table_args__ = ()
+    # Ensure unique stats per team; also the conflict target of the stats upsert
+    __table_args__ = (
+        Index("ux_team_stats_team", "organization", "team_name", unique=True),
+    )
 
 
 class RepositoryStats(Base):
@@ -91,7 +95,7 @@ class PullRequest(Base):
     mergeable_state = Column(String(50), nullable=True)
     review_decision = Column(String(50), nullable=True)
     
-    # Team associations (comma-separated list of teams that care about this PR)
+    # Legacy comma-separated team list, superseded by PRTeamAssociation; only read to backfill older databases
     associated_teams = Column(Text, nullable=True)
     
     # Timestamps
@@ -101,4 +105,30 @@ class PullRequest(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Store the full PR data as JSON for any additional fields we might need
-    pr_data = Column(JSON, nullable=False)
\ No newline at end of file
+    pr_data = Column(JSON, nullable=False)
+    pr_data_hash = Column(String(32), nullable=True)  # BLAKE2s of pr_data, so unchanged PRs aren't rewritten
+    
+    # Composite indexes for the multi-column filters used by the repository and user-relevance queries;
+    # (repository_name, number) is also the conflict target of the GraphQL bulk upsert.
+    # ix_pr_state_updated serves "open PRs, newest first" without a sort (SQLite scans it backwards)
+    __table_args__ = (
+        Index("ux_pr_repo_number", "repository_name", "number", unique=True),
+        Index("ix_pr_repo_state", "repository_name", "state"),
+        Index("ix_pr_state_updated", "state", "github_updated_at"),
+        Index("ix_pr_status_reviewer", "status", "user_is_requested_reviewer"),
+        Index("ix_pr_assigned", "user_is_assigned"),
+    )
+
+
+class PRTeamAssociation(Base):
+    __tablename__ = "pr_team_associations"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    pr_id = Column(Integer, ForeignKey("pull_requests.id", ondelete="CASCADE"), nullable=False)
+    team_key = Column(String(511), nullable=False)  # "org/team"
+    
+    # One row per PR and team; team lookups seek the index and read pr_id without touching the table
+    __table_args__ = (
+        UniqueConstraint("pr_id", "team_key"),
+        Index("ix_pta_team", "team_key", "pr_id"),
+    )
@@ -1,13 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import logging
 
 from app.core.config import settings
 from app.api.routes import router as api_router
 from app.services.scheduler import start_scheduler, stop_scheduler
+from app.services.http_client import close_transport
 from app.utils.logging import setup_logging
-from app.database.database import engine, Base
+from app.database.database import engine, Base, add_missing_columns, drop_duplicate_rows, create_missing_indexes, backfill_team_associations
 # Import models to ensure they're registered with Base
 from app.database import models
 
@@ -20,6 +23,11 @@ async def init_database():
         logger.info("Initializing database...")
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(add_missing_columns)
+            # Backfill first, so team links of duplicate PRs are carried over when duplicates are dropped
+            await conn.run_sync(backfill_team_associations)
+            await conn.run_sync(drop_duplicate_rows)
+            await conn.run_sync(create_missing_indexes)
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
@@ -32,24 +40,32 @@ async def lifespan(app: FastAPI):
     await init_database()
     start_scheduler()
     yield
-    stop_scheduler()
+    await stop_scheduler()
+    await close_transport()
 
 
 app = FastAPI(
     title="PR Monitor Backend",
     description="GitHub PR monitoring backend with FastAPI",
     version="0.1.0",
+    # Same encoder as the API router, for routes declared on the app itself
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
-    allow_credentials=True,
+    # Credentials can't be combined with a wildcard origin, and the frontend sends none
+    allow_credentials="*" not in settings.ALLOWED_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=settings.CORS_MAX_AGE_SECONDS,
 )
 
+# PR listings are large and highly repetitive JSON, so they compress well
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 app.include_router(api_router, prefix="/api/v1")
 
 
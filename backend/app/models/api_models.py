@@ -1,7 +1,7 @@
 from pydantic import BaseModel
 from typing import List, Optional
 from app.models.pr_models import (
-    PullRequest, RepositorySubscription, RepositoryStats,
+    PullRequest, PullRequestSummary, RepositorySubscription, RepositoryStats,
     TeamSubscription, TeamStats, TeamSubscriptionRequest
 )
 
@@ -72,4 +72,12 @@ class GetTeamPullRequestsResponse(BaseModel):
     pull_requests: List[PullRequest]
     organization: str
     team_name: str
-    total_count: int
\ No newline at end of file
+    total_count: int
+    next_cursor: Optional[str] = None  # Set when more pages follow a paginated request
+
+
+class GetTeamPullRequestSummariesResponse(BaseModel):
+    pull_requests: List[PullRequestSummary]
+    organization: str
+    team_name: str
+    total_count: int
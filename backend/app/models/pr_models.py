@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 
 
@@ -85,6 +85,24 @@ class PullRequest(BaseModel):
     user_is_requested_reviewer: bool = False
 
 
+class PullRequestSummary(BaseModel):
+    """
+    Listing fields of a pull request, read from indexed columns rather than the stored PR JSON.
+    
+    A PR is identified by repository_name and number; GraphQL-sourced rows have no real GitHub id.
+    """
+    number: int
+    title: str
+    html_url: str
+    state: str
+    status: str
+    user_is_assigned: bool = False
+    user_is_requested_reviewer: bool = False
+    repository_name: str
+    author_login: str
+    updated_at: datetime
+
+
 class RepositorySubscription(BaseModel):
     repository_name: str
     watch_all_prs: bool = False
@@ -97,7 +115,7 @@ class RepositorySubscription(BaseModel):
 class WebSocketMessage(BaseModel):
     type: str
     data: Dict[str, Any]
-    timestamp: datetime = datetime.utcnow()
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))  # Per message, not per import
 
 
 class RepositoryStats(BaseModel):
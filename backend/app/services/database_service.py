@@ -1,44 +1,84 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, or_, and_, func, case, literal, tuple_, lambda_stmt
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime, timezone
-import json
+import base64
+import hashlib
 import logging
+import orjson
 
 from app.database.models import (
     TeamSubscription as DBTeamSubscription,
     TeamStats as DBTeamStats,
     RepositorySubscription as DBRepositorySubscription,
     RepositoryStats as DBRepositoryStats,
-    PullRequest as DBPullRequest
+    PullRequest as DBPullRequest,
+    PRTeamAssociation as DBPRTeamAssociation
 )
 from app.models.pr_models import (
     TeamSubscription, TeamStats, TeamSubscriptionRequest,
-    RepositorySubscription, RepositoryStats
+    RepositorySubscription, RepositoryStats, PullRequestSummary
 )
 
 logger = logging.getLogger(__name__)
 
+# pull_requests columns written from a PR payload by DatabaseService._pr_row
+PR_ROW_COLUMNS = (
+    'github_id', 'number', 'repository_name', 'title', 'body', 'state', 'html_url',
+    'author_login', 'author_avatar_url', 'draft', 'user_is_assigned', 'user_is_requested_reviewer',
+    'user_has_reviewed', 'status', 'additions', 'deletions', 'changed_files', 'mergeable_state',
+    'review_decision', 'github_created_at', 'github_updated_at', 'pr_data', 'pr_data_hash'
+)
+
+
+def _to_datetime(value) -> datetime:
+    """Parse an ISO timestamp from a PR payload; the scheduler's payloads already hold datetimes"""
+    if isinstance(value, datetime):
+        return value
+    # fromisoformat only accepts a trailing "Z" from Python 3.11
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
 
 class DatabaseService:
+    # Constructed per request; slots keep it a bare wrapper around the session
+    __slots__ = ("db",)
+    
     def __init__(self, db: AsyncSession):
         self.db = db
 
     # Team Subscription Operations
     async def create_team_subscription(self, team_sub: TeamSubscriptionRequest) -> TeamSubscription:
-        """Create a new team subscription"""
-        db_team_sub = DBTeamSubscription(
-            organization=team_sub.organization,
-            team_name=team_sub.team_name,
-            watch_all_prs=team_sub.watch_all_prs,
-            watch_assigned_prs=team_sub.watch_assigned_prs,
-            watch_review_requests=team_sub.watch_review_requests
+        """Create a team subscription, or re-enable and update an existing one, in a single transaction"""
+        result = await self.db.execute(
+            select(DBTeamSubscription).where(
+                DBTeamSubscription.organization == team_sub.organization,
+                DBTeamSubscription.team_name == team_sub.team_name
+            )
         )
+        db_team_sub = result.scalars().first()
+        
+        if db_team_sub:
+            # Re-subscribing must not leave a duplicate row behind
+            db_team_sub.watch_all_prs = team_sub.watch_all_prs
+            db_team_sub.watch_assigned_prs = team_sub.watch_assigned_prs
+            db_team_sub.watch_review_requests = team_sub.watch_review_requests
+            db_team_sub.enabled = True
+        else:
+            db_team_sub = DBTeamSubscription(
+                organization=team_sub.organization,
+                team_name=team_sub.team_name,
+                watch_all_prs=team_sub.watch_all_prs,
+                watch_assigned_prs=team_sub.watch_assigned_prs,
+                watch_review_requests=team_sub.watch_review_requests
+            )
+            self.db.add(db_team_sub)
         
-        self.db.add(db_team_sub)
+        # expire_on_commit is off and the returned fields were all set here, so no re-read is needed
         await self.db.commit()
-        await self.db.refresh(db_team_sub)
         
         return TeamSubscription(
             organization=db_team_sub.organization,
@@ -51,12 +91,12 @@ class DatabaseService:
 
     async def get_team_subscription(self, organization: str, team_name: str) -> Optional[TeamSubscription]:
         """Get a specific team subscription"""
-        result = await self.db.execute(
-            select(DBTeamSubscription).where(
+        result = await self.db.execute(lambda_stmt(
+            lambda: select(DBTeamSubscription).where(
                 DBTeamSubscription.organization == organization,
                 DBTeamSubscription.team_name == team_name
             )
-        )
+        ))
         db_team_sub = result.scalar_one_or_none()
         
         if not db_team_sub:
@@ -88,13 +128,24 @@ class DatabaseService:
         ]
 
     async def delete_team_subscription(self, organization: str, team_name: str) -> bool:
-        """Delete a team subscription"""
+        """Delete a team subscription and its stats in a single transaction"""
         result = await self.db.execute(
             delete(DBTeamSubscription).where(
                 DBTeamSubscription.organization == organization,
                 DBTeamSubscription.team_name == team_name
             )
         )
+        await self.db.execute(
+            delete(DBTeamStats).where(
+                DBTeamStats.organization == organization,
+                DBTeamStats.team_name == team_name
+            )
+        )
+        await self.db.execute(
+            delete(DBPRTeamAssociation).where(
+                DBPRTeamAssociation.team_key == f"{organization}/{team_name}"
+            )
+        )
         await self.db.commit()
         return result.rowcount > 0
 
@@ -103,59 +154,58 @@ class DatabaseService:
                                total_open_prs: int, assigned_to_user: int, 
                                review_requests: int) -> TeamStats:
         """Update or create team statistics"""
-        # Check if stats exist
-        result = await self.db.execute(
-            select(DBTeamStats).where(
-                DBTeamStats.organization == organization,
-                DBTeamStats.team_name == team_name
-            )
-        )
-        db_stats = result.scalar_one_or_none()
-        
-        if db_stats:
-            # Update existing stats
-            db_stats.total_open_prs = total_open_prs
-            db_stats.assigned_to_user = assigned_to_user
-            db_stats.review_requests = review_requests
-            db_stats.last_updated = datetime.now(timezone.utc)
-        else:
-            # Create new stats
-            db_stats = DBTeamStats(
-                organization=organization,
-                team_name=team_name,
-                total_open_prs=total_open_prs,
-                assigned_to_user=assigned_to_user,
-                review_requests=review_requests
-            )
-            self.db.add(db_stats)
+        last_updated = datetime.now(timezone.utc)
+        await self.update_team_stats_many([{
+            "organization": organization,
+            "team_name": team_name,
+            "total_open_prs": total_open_prs,
+            "assigned_to_user": assigned_to_user,
+            "review_requests": review_requests,
+            "last_updated": last_updated
+        }])
         
-        await self.db.commit()
-        await self.db.refresh(db_stats)
-        
-        return TeamStats(
-            organization=db_stats.organization,
-            team_name=db_stats.team_name,
-            total_open_prs=db_stats.total_open_prs,
-            assigned_to_user=db_stats.assigned_to_user,
-            review_requests=db_stats.review_requests,
-            last_updated=db_stats.last_updated,
+        return TeamStats.model_construct(
+            organization=organization,
+            team_name=team_name,
+            total_open_prs=total_open_prs,
+            assigned_to_user=assigned_to_user,
+            review_requests=review_requests,
+            last_updated=last_updated,
             enabled=True  # Default to enabled since stats don't track this directly
         )
 
+    async def update_team_stats_many(self, items: List[dict]) -> None:
+        """Update or create statistics for many teams in one statement; items hold team_stats column values"""
+        if not items:
+            return
+        
+        stmt = sqlite_insert(DBTeamStats)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['organization', 'team_name'],
+            set_={
+                'total_open_prs': stmt.excluded.total_open_prs,
+                'assigned_to_user': stmt.excluded.assigned_to_user,
+                'review_requests': stmt.excluded.review_requests,
+                'last_updated': stmt.excluded.last_updated
+            }
+        )
+        await self.db.execute(stmt, items)
+        await self.db.commit()
+
     async def get_team_stats(self, organization: str, team_name: str) -> Optional[TeamStats]:
         """Get team statistics"""
-        result = await self.db.execute(
-            select(DBTeamStats).where(
+        result = await self.db.execute(lambda_stmt(
+            lambda: select(DBTeamStats).where(
                 DBTeamStats.organization == organization,
                 DBTeamStats.team_name == team_name
             )
-        )
+        ))
         db_stats = result.scalar_one_or_none()
         
         if not db_stats:
             return None
             
-        return TeamStats(
+        return TeamStats.model_construct(
             organization=db_stats.organization,
             team_name=db_stats.team_name,
             total_open_prs=db_stats.total_open_prs,
@@ -167,47 +217,57 @@ class DatabaseService:
 
     async def get_all_team_stats(self) -> List[TeamStats]:
         """Get all team statistics with enabled status from subscriptions"""
+        # Only the returned columns are selected, so no DBTeamStats objects are built; both sides
+        # are unique on (organization, team_name), so the join yields one row per team
         result = await self.db.execute(
-            select(DBTeamStats, DBTeamSubscription.enabled).join(
+            select(
+                DBTeamStats.organization,
+                DBTeamStats.team_name,
+                DBTeamStats.total_open_prs,
+                DBTeamStats.assigned_to_user,
+                DBTeamStats.review_requests,
+                DBTeamStats.last_updated,
+                DBTeamSubscription.enabled
+            ).join(
                 DBTeamSubscription,
                 (DBTeamStats.organization == DBTeamSubscription.organization) &
                 (DBTeamStats.team_name == DBTeamSubscription.team_name)
             )
         )
-        rows = result.fetchall()
         
+        # Rows come from typed columns, so skip re-validating every stats model
         return [
-            TeamStats(
-                organization=row[0].organization,
-                team_name=row[0].team_name,
-                total_open_prs=row[0].total_open_prs,
-                assigned_to_user=row[0].assigned_to_user,
-                review_requests=row[0].review_requests,
-                last_updated=row[0].last_updated,
-                enabled=row[1] if len(row) > 1 else True
+            TeamStats.model_construct(
+                organization=row.organization,
+                team_name=row.team_name,
+                total_open_prs=row.total_open_prs,
+                assigned_to_user=row.assigned_to_user,
+                review_requests=row.review_requests,
+                last_updated=row.last_updated,
+                enabled=row.enabled if row.enabled is not None else True
             )
-            for row in rows
+            for row in result
         ]
 
     async def enable_team_subscription(self, organization: str, team_name: str) -> bool:
         """Enable a team subscription"""
-        result = await self.db.execute(
-            update(DBTeamSubscription).where(
+        result = await self.db.execute(lambda_stmt(
+            lambda: update(DBTeamSubscription).where(
                 DBTeamSubscription.organization == organization,
                 DBTeamSubscription.team_name == team_name
             ).values(enabled=True)
-        )
+        ))
         await self.db.commit()
         return result.rowcount > 0
 
     async def disable_team_subscription(self, organization: str, team_name: str) -> bool:
         """Disable a team subscription"""
-        result = await self.db.execute(
-            update(DBTeamSubscription).where(
+        result = await self.db.execute(lambda_stmt(
+            lambda: update(DBTeamSubscription).where(
                 DBTeamSubscription.organization == organization,
                 DBTeamSubscription.team_name == team_name
             ).values(enabled=False)
-        )
+        ))
         await self.db.commit()
         return result.rowcount > 0
 
@@ -244,7 +304,6 @@ class DatabaseService:
         
         self.db.add(db_repo_sub)
         await self.db.commit()
-        await self.db.refresh(db_repo_sub)
         
         return RepositorySubscription(
             repository_name=db_repo_sub.repository_name,
@@ -257,11 +316,11 @@ class DatabaseService:
     
     async def get_repository_subscription(self, repository_name: str) -> Optional[RepositorySubscription]:
         """Get a specific repository subscription"""
-        result = await self.db.execute(
-            select(DBRepositorySubscription).where(
+        result = await self.db.execute(lambda_stmt(
+            lambda: select(DBRepositorySubscription).where(
                 DBRepositorySubscription.repository_name == repository_name
             )
-        )
+        ))
         db_repo_sub = result.scalar_one_or_none()
         
         if not db_repo_sub:
@@ -325,112 +384,119 @@ class DatabaseService:
                                      total_open_prs: int, assigned_to_user: int, 
                                      review_requests: int, code_owner_prs: int = 0) -> RepositoryStats:
         """Update or create repository statistics"""
-        # Check if stats exist
-        result = await self.db.execute(
-            select(DBRepositoryStats).where(
-                DBRepositoryStats.repository_name == repository_name
-            )
-        )
-        db_stats = result.scalar_one_or_none()
-        
-        if db_stats:
-            # Update existing stats
-            db_stats.total_open_prs = total_open_prs
-            db_stats.assigned_to_user = assigned_to_user
-            db_stats.review_requests = review_requests
-            db_stats.code_owner_prs = code_owner_prs
-            db_stats.last_updated = datetime.now(timezone.utc)
-        else:
-            # Create new stats
-            db_stats = DBRepositoryStats(
-                repository_name=repository_name,
-                total_open_prs=total_open_prs,
-                assigned_to_user=assigned_to_user,
-                review_requests=review_requests,
-                code_owner_prs=code_owner_prs
-            )
-            self.db.add(db_stats)
-        
-        await self.db.commit()
-        await self.db.refresh(db_stats)
+        await self.update_repository_stats_many([{
+            "repository_name": repository_name,
+            "total_open_prs": total_open_prs,
+            "assigned_to_user": assigned_to_user,
+            "review_requests": review_requests,
+            "code_owner_prs": code_owner_prs,
+            "last_updated": datetime.now(timezone.utc)
+        }])
         
         # Return None since we don't have the full Repository object needed for RepositoryStats
         # This method is just for updating the database
         return None
     
+    async def update_repository_stats_many(self, items: List[dict]) -> None:
+        """Update or create statistics for many repositories in one statement; items hold repository_stats column values"""
+        if not items:
+            return
+        
+        stmt = sqlite_insert(DBRepositoryStats)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['repository_name'],
+            set_={
+                'total_open_prs': stmt.excluded.total_open_prs,
+                'assigned_to_user': stmt.excluded.assigned_to_user,
+                'review_requests': stmt.excluded.review_requests,
+                'code_owner_prs': stmt.excluded.code_owner_prs,
+                'last_updated': stmt.excluded.last_updated
+            }
+        )
+        await self.db.execute(stmt, items)
+        await self.db.commit()
+    
     # Pull Request Operations
+    def _pr_row(self, pr_data: dict, github_id: int) -> dict:
+        """Map a PR payload onto pull_requests column values"""
+        # orjson writes datetimes and enums natively, in one C pass over the payload
+        pr_bytes = orjson.dumps(pr_data)
+        return {
+            "github_id": github_id,
+            "number": pr_data['number'],
+            "repository_name": pr_data['repository']['full_name'],
+            "title": pr_data['title'],
+            "body": pr_data.get('body', ''),
+            "state": pr_data['state'],
+            "html_url": pr_data['html_url'],
+            "author_login": pr_data['user']['login'],
+            "author_avatar_url": pr_data['user'].get('avatar_url'),
+            "draft": pr_data.get('draft', False),
+            "user_is_assigned": pr_data.get('user_is_assigned', False),
+            "user_is_requested_reviewer": pr_data.get('user_is_requested_reviewer', False),
+            "user_has_reviewed": pr_data.get('user_has_reviewed', False),
+            "status": pr_data.get('status', 'needs_review'),
+            "additions": pr_data.get('additions', 0),
+            "deletions": pr_data.get('deletions', 0),
+            "changed_files": pr_data.get('changed_files', 0),
+            "mergeable_state": pr_data.get('mergeable_state'),
+            "review_decision": pr_data.get('review_decision'),
+            "github_created_at": _to_datetime(pr_data['created_at']),
+            "github_updated_at": _to_datetime(pr_data['updated_at']),
+            "pr_data": pr_bytes.decode(),
+            "pr_data_hash": hashlib.blake2s(pr_bytes, digest_size=16).hexdigest()
+        }
+    
+    @staticmethod
+    def _upsert_statement(conflict_columns: List[str]):
+        """
+        Build a bulk INSERT ... ON CONFLICT DO UPDATE for pull_requests rows from _pr_row.
+        
+        Every mapped column except github_id is overwritten on conflict: GraphQL rows keep
+        the id they were created with, and REST rows conflict on github_id itself. Rows whose
+        pr_data hash is unchanged are left alone, so unchanged PRs cost no write.
+        """
+        stmt = sqlite_insert(DBPullRequest)
+        updated = {
+            column: getattr(stmt.excluded, column)
+            for column in PR_ROW_COLUMNS if column != 'github_id'
+        }
+        # ON CONFLICT updates don't apply Column.onupdate, so bump updated_at here
+        updated['updated_at'] = func.now()
+        return stmt.on_conflict_do_update(
+            index_elements=conflict_columns,
+            set_=updated,
+            where=DBPullRequest.pr_data_hash.is_distinct_from(stmt.excluded.pr_data_hash)
+        )
+    
     async def upsert_pull_requests_graphql(self, pull_requests: List[dict], team_key: str = None) -> None:
-        """Insert or update PRs from GraphQL (which don't have real GitHub IDs)"""
+        """Insert or update PRs from GraphQL (which don't have real GitHub IDs) in one statement"""
         logger.info(f"Upserting {len(pull_requests)} PRs with team_key: {team_key}")
-        for pr_data in pull_requests:
-            # Use repository + number as key since GraphQL doesn't provide real IDs
-            repo_name = pr_data['repository']['full_name']
-            pr_number = pr_data['number']
-            
-            # Check if PR exists by repo + number
-            result = await self.db.execute(
-                select(DBPullRequest).where(
-                    DBPullRequest.repository_name == repo_name,
-                    DBPullRequest.number == pr_number
-                )
+        if not pull_requests:
+            return
+        
+        # Use repository + number as key since GraphQL doesn't provide real IDs; new rows get a
+        # unique fake GitHub ID from a hash of repo+number, existing rows keep theirs
+        rows = [
+            self._pr_row(
+                pr_data,
+                -abs(hash(f"{pr_data['repository']['full_name']}#{pr_data['number']}")) % (2**31)
+            )
+            for pr_data in pull_requests
+        ]
+        await self.db.execute(self._upsert_statement(['repository_name', 'number']), rows)
+        
+        if team_key:
+            # Link every PR in the batch to the team (existing links are kept)
+            keys = [(row['repository_name'], row['number']) for row in rows]
+            await self.db.execute(
+                sqlite_insert(DBPRTeamAssociation).from_select(
+                    ['pr_id', 'team_key'],
+                    select(DBPullRequest.id, literal(team_key)).where(
+                        tuple_(DBPullRequest.repository_name, DBPullRequest.number).in_(keys)
+                    )
+                ).on_conflict_do_nothing(index_elements=['pr_id', 'team_key'])
             )
-            db_pr = result.scalar_one_or_none()
-            
-            if db_pr:
-                # Update existing PR (keep original github_id if it exists)
-                for key, value in pr_data.items():
-                    if key == 'id':
-                        continue  # Skip placeholder ID
-                    elif key == 'repository':
-                        db_pr.repository_name = value['full_name']
-                    elif key == 'user':
-                        db_pr.author_login = value['login']
-                        db_pr.author_avatar_url = value.get('avatar_url')
-                    elif key == 'created_at':
-                        if isinstance(value, str):
-                            db_pr.github_created_at = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                        else:
-                            db_pr.github_created_at = value
-                    elif key == 'updated_at':
-                        if isinstance(value, str):
-                            db_pr.github_updated_at = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                        else:
-                            db_pr.github_updated_at = value
-                    elif hasattr(db_pr, key):
-                        setattr(db_pr, key, value)
-                
-                # Update team associations if provided
-                if team_key:
-                    existing_teams = set(db_pr.associated_teams.split(',') if db_pr.associated_teams else [])
-                    existing_teams.add(team_key)
-                    db_pr.associated_teams = ','.join(existing_teams)
-                    logger.debug(f"Updated PR {repo_name}#{pr_number} team associations: {db_pr.associated_teams}")
-                
-                # Update JSON data
-                pr_data_serializable = self._convert_datetimes_to_strings(pr_data)
-                db_pr.pr_data = json.dumps(pr_data_serializable)
-            else:
-                # Create new PR with a unique fake GitHub ID for GraphQL PRs
-                # Use a negative number based on hash of repo+number to avoid conflicts
-                fake_github_id = -abs(hash(f"{repo_name}#{pr_number}")) % (2**31)
-                
-                db_pr = DBPullRequest(
-                    github_id=fake_github_id,  # Unique fake ID for GraphQL PRs
-                    number=pr_data['number'],
-                    repository_name=pr_data['repository']['full_name'],
-                    title=pr_data['title'],
-                    body=pr_data.get('body', ''),
-                    state=pr_data['state'],
-                    html_url=pr_data['html_url'],
-                    author_login=pr_data['user']['login'],
-                    author_avatar_url=pr_data['user'].get('avatar_url'),
-                    github_created_at=datetime.fromisoformat(pr_data['created_at'].replace('Z', '+00:00')) if isinstance(pr_data['created_at'], str) else pr_data['created_at'],
-                    github_updated_at=datetime.fromisoformat(pr_data['updated_at'].replace('Z', '+00:00')) if isinstance(pr_data['updated_at'], str) else pr_data['updated_at'],
-                    pr_data=json.dumps(self._convert_datetimes_to_strings(pr_data)),
-                    associated_teams=team_key if team_key else None
-                )
-                logger.debug(f"Creating PR {repo_name}#{pr_number} with team associations: {team_key}")
-                self.db.add(db_pr)
         
         await self.db.commit()
 
@@ -439,121 +505,232 @@ class DatabaseService:
         # Get list of GitHub IDs that came back from API
         returned_pr_ids = {pr_data['id'] for pr_data in pull_requests}
         
-        for pr_data in pull_requests:
-            # Check if PR exists
-            result = await self.db.execute(
-                select(DBPullRequest).where(DBPullRequest.github_id == pr_data['id'])
-            )
-            db_pr = result.scalar_one_or_none()
-            
-            if db_pr:
-                # Update existing PR
-                for key, value in pr_data.items():
-                    if key == 'id':
-                        continue  # Skip GitHub ID, it's immutable
-                    elif key == 'repository':
-                        db_pr.repository_name = value['full_name']
-                    elif key == 'user':
-                        db_pr.author_login = value['login']
-                        db_pr.author_avatar_url = value.get('avatar_url')
-                    elif key == 'created_at':
-                        if isinstance(value, str):
-                            db_pr.github_created_at = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                        else:
-                            db_pr.github_created_at = value
-                    elif key == 'updated_at':
-                        if isinstance(value, str):
-                            db_pr.github_updated_at = datetime.fromisoformat(value.replace('Z', '+00:00'))
-                        else:
-                            db_pr.github_updated_at = value
-                    elif hasattr(db_pr, key):
-                        setattr(db_pr, key, value)
-                
-                # Always update the full JSON data (serialize to string for SQLite)
-                # Convert datetime objects to strings
-                pr_data_serializable = self._convert_datetimes_to_strings(pr_data)
-                db_pr.pr_data = json.dumps(pr_data_serializable)
-            else:
-                # Create new PR
-                db_pr = DBPullRequest(
-                    github_id=pr_data['id'],
-                    number=pr_data['number'],
-                    repository_name=pr_data['repository']['full_name'],
-                    title=pr_data['title'],
-                    body=pr_data.get('body', ''),
-                    state=pr_data['state'],
-                    html_url=pr_data['html_url'],
-                    author_login=pr_data['user']['login'],
-                    author_avatar_url=pr_data['user'].get('avatar_url'),
-                    draft=pr_data.get('draft', False),
-                    user_is_assigned=pr_data.get('user_is_assigned', False),
-                    user_is_requested_reviewer=pr_data.get('user_is_requested_reviewer', False),
-                    user_has_reviewed=pr_data.get('user_has_reviewed', False),
-                    status=pr_data.get('status', 'needs_review'),
-                    additions=pr_data.get('additions', 0),
-                    deletions=pr_data.get('deletions', 0),
-                    changed_files=pr_data.get('changed_files', 0),
-                    mergeable_state=pr_data.get('mergeable_state'),
-                    review_decision=pr_data.get('review_decision'),
-                    github_created_at=datetime.fromisoformat(pr_data['created_at'].replace('Z', '+00:00')) if isinstance(pr_data['created_at'], str) else pr_data['created_at'],
-                    github_updated_at=datetime.fromisoformat(pr_data['updated_at'].replace('Z', '+00:00')) if isinstance(pr_data['updated_at'], str) else pr_data['updated_at'],
-                    pr_data=json.dumps(self._convert_datetimes_to_strings(pr_data))
-                )
-                self.db.add(db_pr)
+        if pull_requests:
+            rows = [self._pr_row(pr_data, pr_data['id']) for pr_data in pull_requests]
+            await self.db.execute(self._upsert_statement(['github_id']), rows)
         
         # Remove PRs that are no longer open (didn't come back from API)
         if repository_name:
             # For repository-specific updates, only remove PRs from that repository
-            existing_prs = await self.db.execute(
-                select(DBPullRequest).where(
-                    DBPullRequest.repository_name == repository_name,
-                    DBPullRequest.state == 'open'
-                )
+            closed_prs = select(DBPullRequest.id).where(
+                DBPullRequest.repository_name == repository_name,
+                DBPullRequest.state == 'open',
+                DBPullRequest.github_id.notin_(returned_pr_ids)
             )
-            existing_pr_ids = {pr.github_id for pr in existing_prs.scalars().all()}
-            
-            # PRs that exist in DB but not in API response are now closed
-            closed_pr_ids = existing_pr_ids - returned_pr_ids
-            
-            if closed_pr_ids:
-                logger.info(f"Removing {len(closed_pr_ids)} closed PRs from repository {repository_name}")
-                await self.db.execute(
-                    delete(DBPullRequest).where(
-                        DBPullRequest.github_id.in_(closed_pr_ids),
-                        DBPullRequest.repository_name == repository_name
-                    )
-                )
+            # SQLite doesn't enforce the foreign key cascade unless enabled, so drop the team links explicitly
+            await self.db.execute(
+                delete(DBPRTeamAssociation).where(DBPRTeamAssociation.pr_id.in_(closed_prs))
+            )
+            result = await self.db.execute(
+                delete(DBPullRequest).where(DBPullRequest.id.in_(closed_prs))
+            )
+            if result.rowcount:
+                logger.info(f"Removed {result.rowcount} closed PRs from repository {repository_name}")
         
         await self.db.commit()
     
     async def get_repository_pull_requests(self, repository_name: str, state: str = None) -> List[dict]:
         """Get pull requests for a repository, optionally filtered by state"""
-        query = select(DBPullRequest).where(DBPullRequest.repository_name == repository_name)
+        query = select(DBPullRequest.pr_data).where(DBPullRequest.repository_name == repository_name)
         
         if state:
             query = query.where(DBPullRequest.state == state)
             
         query = query.order_by(DBPullRequest.github_updated_at.desc())
         result = await self.db.execute(query)
-        db_prs = result.scalars().all()
         
-        return [json.loads(pr.pr_data) for pr in db_prs]
+        return [orjson.loads(pr_data) for pr_data in result.scalars()]
+    
+    @staticmethod
+    def _for_team(query, team_key: str):
+        """Restrict a pull request query to one team's PRs through the association table"""
+        return query.join(
+            DBPRTeamAssociation, DBPRTeamAssociation.pr_id == DBPullRequest.id
+        ).where(DBPRTeamAssociation.team_key == team_key)
     
     async def get_team_pull_requests(self, team_key: str, state: str = None) -> List[dict]:
         """Get pull requests associated with a team, optionally filtered by state"""
-        query = select(DBPullRequest).where(DBPullRequest.associated_teams.contains(team_key))
+        query = self._for_team(select(DBPullRequest.pr_data), team_key)
+        
+        if state:
+            query = query.where(DBPullRequest.state == state)
+            
+        query = query.order_by(DBPullRequest.github_updated_at.desc())
+        result = await self.db.execute(query)
+        
+        return [orjson.loads(pr_data) for pr_data in result.scalars()]
+    
+    async def get_pull_requests_for_teams(self, team_keys: Iterable[str], state: str = None) -> Dict[str, List[dict]]:
+        """Get pull requests for several teams in one query, grouped by team key (newest first)"""
+        team_keys = set(team_keys)
+        prs_by_team: Dict[str, List[dict]] = {team_key: [] for team_key in team_keys}
+        if not team_keys:
+            return prs_by_team
+        
+        query = select(
+            DBPRTeamAssociation.team_key, DBPullRequest.id, DBPullRequest.pr_data
+        ).join(
+            DBPRTeamAssociation, DBPRTeamAssociation.pr_id == DBPullRequest.id
+        ).where(DBPRTeamAssociation.team_key.in_(team_keys))
+        
+        if state:
+            query = query.where(DBPullRequest.state == state)
+            
+        query = query.order_by(DBPullRequest.github_updated_at.desc())
+        result = await self.db.execute(query)
+        
+        # Decode each PR once and share it between the teams it belongs to
+        decoded = {}
+        for row in result:
+            pr_dict = decoded.get(row.id)
+            if pr_dict is None:
+                pr_dict = decoded[row.id] = orjson.loads(row.pr_data)
+            prs_by_team[row.team_key].append(pr_dict)
+        
+        return prs_by_team
+    
+    async def get_team_repository_stats(self, team_keys: Iterable[str]) -> List[dict]:
+        """Aggregate the teams' pull requests per repository: PR counts, which teams, and the repository object"""
+        team_keys = set(team_keys)
+        if not team_keys:
+            return []
+        
+        # pr_data holds JSON-encoded text, so unwrap it before reaching into the repository object
+        repository_json = func.json_extract(func.json_extract(DBPullRequest.pr_data, '$'), '$.repository')
+        query = select(
+            DBPullRequest.repository_name,
+            DBPRTeamAssociation.team_key,
+            func.count().label("total_open_prs"),
+            func.sum(case((DBPullRequest.user_is_assigned.is_(True), 1), else_=0)).label("assigned_to_user"),
+            func.sum(case((DBPullRequest.user_is_requested_reviewer.is_(True), 1), else_=0)).label("review_requests"),
+            func.min(repository_json).label("repository")
+        ).join(
+            DBPRTeamAssociation, DBPRTeamAssociation.pr_id == DBPullRequest.id
+        ).where(
+            DBPRTeamAssociation.team_key.in_(team_keys)
+        ).group_by(DBPullRequest.repository_name, DBPRTeamAssociation.team_key)
+        result = await self.db.execute(query)
+        
+        # Rows are per (repository, team); a PR shared by two teams counts once for each, as it always has
+        repositories = {}
+        for row in result:
+            repo_stats = repositories.get(row.repository_name)
+            if repo_stats is None:
+                repo_stats = repositories[row.repository_name] = {
+                    "repository_name": row.repository_name,
+                    "repository": orjson.loads(row.repository) if row.repository else {},
+                    "total_open_prs": 0,
+                    "assigned_to_user": 0,
+                    "review_requests": 0,
+                    "from_teams": []
+                }
+            repo_stats["total_open_prs"] += row.total_open_prs
+            repo_stats["assigned_to_user"] += row.assigned_to_user
+            repo_stats["review_requests"] += row.review_requests
+            repo_stats["from_teams"].append(row.team_key)
+        
+        return list(repositories.values())
+    
+    async def get_team_pull_requests_json(self, team_key: str, state: str = None) -> List[str]:
+        """Get the stored JSON of each team pull request, newest first, without decoding it"""
+        query = self._for_team(select(DBPullRequest.pr_data), team_key)
+        
+        if state:
+            query = query.where(DBPullRequest.state == state)
+            
+        query = query.order_by(DBPullRequest.github_updated_at.desc())
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+    
+    async def get_team_pull_request_summaries(self, team_key: str, state: str = None) -> List[PullRequestSummary]:
+        """Get summaries of a team's pull requests, newest first, from columns only (pr_data is never read)"""
+        query = select(
+            DBPullRequest.number,
+            DBPullRequest.title,
+            DBPullRequest.html_url,
+            DBPullRequest.state,
+            DBPullRequest.status,
+            DBPullRequest.user_is_assigned,
+            DBPullRequest.user_is_requested_reviewer,
+            DBPullRequest.repository_name,
+            DBPullRequest.author_login,
+            DBPullRequest.github_updated_at.label("updated_at")
+        )
+        query = self._for_team(query, team_key)
         
         if state:
             query = query.where(DBPullRequest.state == state)
             
         query = query.order_by(DBPullRequest.github_updated_at.desc())
         result = await self.db.execute(query)
-        db_prs = result.scalars().all()
+        # Columns come straight from our own rows, so skip validation; SQLite hands datetimes
+        # back naive, and GitHub timestamps are stored in UTC
+        return [
+            PullRequestSummary.model_construct(**{**row, "updated_at": row["updated_at"].replace(tzinfo=timezone.utc)})
+            for row in result.mappings()
+        ]
+    
+    async def get_team_pull_requests_page(
+        self, team_key: str, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[str], Optional[str]]:
+        """Get the stored JSON of one page of a team's pull requests, newest first, plus the cursor for the next page"""
+        query = self._for_team(select(
+            DBPullRequest.id, DBPullRequest.github_updated_at, DBPullRequest.pr_data
+        ), team_key)
+        
+        # Keyset pagination: continue strictly after the last row of the previous page
+        if cursor:
+            updated_at, pr_id = self._decode_cursor(cursor)
+            query = query.where(or_(
+                DBPullRequest.github_updated_at < updated_at,
+                and_(DBPullRequest.github_updated_at == updated_at, DBPullRequest.id < pr_id)
+            ))
         
-        return [json.loads(pr.pr_data) for pr in db_prs]
+        # Fetch one extra row to learn whether another page follows
+        query = query.order_by(
+            DBPullRequest.github_updated_at.desc(), DBPullRequest.id.desc()
+        ).limit(limit + 1)
+        rows = (await self.db.execute(query)).all()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(rows[-1].github_updated_at, rows[-1].id)
+        
+        return [row.pr_data for row in rows], next_cursor
+    
+    async def count_team_pull_requests(self, team_key: str) -> int:
+        """Count all of a team's pull requests, across every page"""
+        query = self._for_team(select(func.count()).select_from(DBPullRequest), team_key)
+        return (await self.db.execute(query)).scalar_one()
+    
+    @staticmethod
+    def _encode_cursor(updated_at: datetime, pr_id: int) -> str:
+        return base64.urlsafe_b64encode(f"{updated_at.isoformat()}|{pr_id}".encode()).decode()
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        """Decode a page cursor, raising ValueError if it is malformed"""
+        try:
+            updated_at, pr_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            return datetime.fromisoformat(updated_at), int(pr_id)
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+    
+    async def stream_team_pull_requests(self, team_key: str, state: str = None) -> AsyncIterator[str]:
+        """Yield the stored JSON of each team pull request one row at a time, without decoding it"""
+        query = self._for_team(select(DBPullRequest.pr_data), team_key)
+        
+        if state:
+            query = query.where(DBPullRequest.state == state)
+            
+        query = query.order_by(DBPullRequest.github_updated_at.desc())
+        result = await self.db.stream_scalars(query)
+        async for pr_data in result:
+            yield pr_data
     
-    async def get_user_relevant_pull_requests(self, subscribed_repos: List[str], subscribed_teams: List[str]) -> List[dict]:
-        """Get all open pull requests relevant to the current user across all subscribed repositories and teams"""
+    async def get_user_relevant_pull_requests(self, subscribed_repos: Iterable[str], subscribed_teams: Iterable[str]) -> List[dict]:
+        """Get open pull requests relevant to the current user across all subscribed repositories and teams"""
         try:
             # Build the query for user-relevant PRs
             conditions = []
@@ -565,32 +742,36 @@ class DatabaseService:
             
             # PRs from subscribed teams
             if subscribed_teams:
-                team_conditions = []
-                for team_key in subscribed_teams:
-                    team_conditions.append(DBPullRequest.associated_teams.contains(team_key))
-                if team_conditions:
-                    from sqlalchemy import or_
-                    conditions.append(or_(*team_conditions))
+                conditions.append(DBPullRequest.id.in_(
+                    select(DBPRTeamAssociation.pr_id).where(DBPRTeamAssociation.team_key.in_(subscribed_teams))
+                ))
             
             if not conditions:
                 return []
             
             # Combine all conditions with OR (PRs from repos OR teams)
-            from sqlalchemy import or_
             combined_condition = or_(*conditions)
             
-            # Don't filter by user relevance in SQL - let the application layer handle it
-            # This is because GraphQL PRs don't have accurate user_is_assigned/user_is_requested_reviewer values
+            # Relevant to the user: assigned, review requested, or awaiting a review they haven't given.
+            # The scheduler computes these fields before storing, and both upsert paths write them to columns
+            relevance_condition = or_(
+                DBPullRequest.user_is_assigned.is_(True),
+                DBPullRequest.user_is_requested_reviewer.is_(True),
+                and_(
+                    DBPullRequest.status == 'needs_review',
+                    DBPullRequest.user_has_reviewed.isnot(True)
+                )
+            )
             
             result = await self.db.execute(
-                select(DBPullRequest).where(
+                select(DBPullRequest.pr_data).where(
                     combined_condition,
+                    relevance_condition,
                     DBPullRequest.state == 'open'
                 ).order_by(DBPullRequest.github_updated_at.desc())
             )
-            db_prs = result.scalars().all()
             
-            return [json.loads(pr.pr_data) for pr in db_prs]
+            return [orjson.loads(pr_data) for pr_data in result.scalars()]
             
         except Exception as e:
             logger.error(f"Error getting user relevant PRs: {e}")
@@ -599,12 +780,16 @@ class DatabaseService:
     async def update_pr_team_associations(self, pr_id: int, team_keys: List[str]) -> None:
         """Update which teams are associated with a PR"""
         result = await self.db.execute(
-            select(DBPullRequest).where(DBPullRequest.github_id == pr_id)
+            select(DBPullRequest.id).where(DBPullRequest.github_id == pr_id)
         )
-        db_pr = result.scalar_one_or_none()
+        db_pr_id = result.scalar_one_or_none()
         
-        if db_pr:
-            db_pr.associated_teams = ','.join(team_keys) if team_keys else None
+        if db_pr_id is not None:
+            await self.db.execute(
+                delete(DBPRTeamAssociation).where(DBPRTeamAssociation.pr_id == db_pr_id)
+            )
+            for team_key in set(team_keys):
+                self.db.add(DBPRTeamAssociation(pr_id=db_pr_id, team_key=team_key))
             await self.db.commit()
     
     async def delete_closed_pull_requests(self) -> int:
@@ -616,20 +801,8 @@ class DatabaseService:
     async def get_all_pull_requests(self) -> List[dict]:
         """Get all open pull requests"""
         result = await self.db.execute(
-            select(DBPullRequest).where(DBPullRequest.state == 'open')
+            select(DBPullRequest.pr_data).where(DBPullRequest.state == 'open')
             .order_by(DBPullRequest.github_updated_at.desc())
         )
-        db_prs = result.scalars().all()
         
-        return [json.loads(pr.pr_data) for pr in db_prs]
-    
-    def _convert_datetimes_to_strings(self, obj):
-        """Recursively convert datetime objects to ISO format strings for JSON serialization"""
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        elif isinstance(obj, dict):
-            return {key: self._convert_datetimes_to_strings(value) for key, value in obj.items()}
-        elif isinstance(obj, list):
-            return [self._convert_datetimes_to_strings(item) for item in obj]
-        else:
-            return obj
\ No newline at end of file
+        return [orjson.loads(pr_data) for pr_data in result.scalars()]
@@ -0,0 +1,75 @@
+"""
+In-process cache for GitHub REST responses, keyed by request and validated with ETags.
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import Any, Dict, Optional
+
+# Upper bound on cached responses; the oldest entries are evicted first
+MAX_ENTRIES = 10000
+
+
+class CacheEntry:
+    """A cached GitHub response body with its ETag and freshness window"""
+
+    def __init__(self, data: Any, ttl: float, etag: Optional[str] = None):
+        self.data = data
+        self.ttl = ttl
+        self.etag = etag
+        self.ts = time.monotonic()
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.monotonic() - self.ts < self.ttl
+
+    def touch(self):
+        """Restart the freshness window, e.g. after GitHub answered 304 Not Modified"""
+        self.ts = time.monotonic()
+
+
+class GitHubCache:
+    """Response cache with a per-key lock so concurrent misses share one upstream request"""
+
+    def __init__(self):
+        self._entries: Dict[str, CacheEntry] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict[str, Any]] = None, token: Optional[str] = None) -> str:
+        """Build a cache key from the request; the token is included so users never share entries"""
+        raw = f"{token or ''}|{url}|{sorted((params or {}).items())}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def lock(self, key: str) -> asyncio.Lock:
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        return self._locks[key]
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        return self._entries.get(key)
+
+    def set(self, key: str, data: Any, ttl: float, etag: Optional[str] = None) -> CacheEntry:
+        entry = CacheEntry(data, ttl, etag)
+        # Re-insert so dict order tracks recency of writes
+        self._entries.pop(key, None)
+        self._entries[key] = entry
+        while len(self._entries) > MAX_ENTRIES:
+            oldest = next(iter(self._entries))
+            del self._entries[oldest]
+            lock = self._locks.get(oldest)
+            if lock is not None and not lock.locked():
+                del self._locks[oldest]
+        return entry
+
+    def invalidate(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._locks.clear()
+
+
+# Global cache instance
+gh_cache = GitHubCache()
@@ -5,22 +5,131 @@ import logging
 
 from app.models.pr_models import PullRequest, Repository, User, Review, Team
 from app.services.token_service import token_service
+from app.services.http_client import get_transport
 
 logger = logging.getLogger(__name__)
 
+# Fields selected for every pull request search
+PR_SEARCH_SELECTION = """
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+    nodes {
+      ... on PullRequest {
+        number
+        title
+        body
+        url
+        state
+        createdAt
+        updatedAt
+        isDraft
+        repository {
+          id
+          name
+          owner {
+            login
+          }
+          url
+          description
+          isPrivate
+        }
+        author {
+          login
+          ... on User {
+            name
+            avatarUrl
+          }
+        }
+        assignees(first: 10) {
+          nodes {
+            login
+            name
+            avatarUrl
+            url
+          }
+        }
+        reviewRequests(first: 10) {
+          nodes {
+            requestedReviewer {
+              ... on User {
+                login
+                name
+                avatarUrl
+                url
+              }
+              ... on Team {
+                id
+                name
+                slug
+                description
+                privacy
+              }
+            }
+          }
+        }
+        reviews(first: 20) {
+          nodes {
+            author {
+              login
+              ... on User {
+                name
+                avatarUrl
+                url
+              }
+            }
+            state
+            submittedAt
+          }
+        }
+        labels(first: 10) {
+          nodes {
+            name
+          }
+        }
+      }
+    }
+
+"""
+
+SEARCH_PAGE_QUERY = (
+    "query($searchQuery: String!, $cursor: String) {\n"
+    "  search(query: $searchQuery, type: ISSUE, first: 100, after: $cursor) {"
+    + PR_SEARCH_SELECTION
+    + "  }\n}"
+)
+
+# Author-batch searches folded into each aliased GraphQL request
+SEARCHES_PER_REQUEST = 5
+
+
+def build_batched_search_query(count: int) -> str:
+    """Build one query running `count` aliased searches (s0, s1, ...) over $q0, $q1, ..."""
+    params = ", ".join(f"$q{i}: String!" for i in range(count))
+    searches = "".join(
+        f"  s{i}: search(query: $q{i}, type: ISSUE, first: 100) {{{PR_SEARCH_SELECTION}  }}\n"
+        for i in range(count)
+    )
+    return f"query({params}) {{\n{searches}}}"
+
+
 class GitHubGraphQLServiceV2:
     """Optimized GraphQL service that only fetches data for user's teams"""
     
     def __init__(self):
+        # Built on the shared connection pool so each poll reuses open connections to GitHub
         self.client = httpx.AsyncClient(
             headers={
                 "Accept": "application/vnd.github.v3+json",
-            }
+            },
+            transport=get_transport()
         )
     
     async def close(self):
-        """Close the HTTP client"""
-        await self.client.aclose()
+        """Release the HTTP client; the shared transport underneath stays open"""
+        # aclose() would close the shared pool, so just drop the reference
+        self.client = None
     
     async def get_user_teams(self) -> List[Dict[str, str]]:
         """Get teams that the authenticated user belongs to"""
@@ -174,16 +283,11 @@ class GitHubGraphQLServiceV2:
         
         # Now get PRs for these members
         member_logins = [m["login"] for m in all_members]
-        all_prs = []
         
         # GitHub search is limited to ~30 authors per query, so batch them
         batch_size = 20
-        for i in range(0, len(member_logins), batch_size):
-            batch = member_logins[i:i + batch_size]
-            logger.info(f"Fetching PRs for batch of {len(batch)} authors: {batch}")
-            prs = await self._fetch_prs_for_authors(batch, organization)
-            logger.info(f"Found {len(prs)} PRs for this batch")
-            all_prs.extend(prs)
+        batches = [member_logins[i:i + batch_size] for i in range(0, len(member_logins), batch_size)]
+        all_prs = await self._fetch_prs_for_author_batches(batches, organization)
         
         # Deduplicate PRs (in case of co-authored PRs)
         unique_prs = {}
@@ -194,12 +298,8 @@ class GitHubGraphQLServiceV2:
         logger.info(f"Found {len(unique_prs)} unique PRs for team {organization}/{team_slug}")
         return list(unique_prs.values())
     
-    async def _fetch_prs_for_authors(self, authors: List[str], organization: str) -> List[PullRequest]:
-        """Fetch PRs for a batch of authors using search API with GraphQL"""
-        if not token_service.token:
-            raise ValueError("GitHub token not set")
-        token = token_service.token
-        
+    def _author_search_query(self, authors: List[str], organization: str) -> str:
+        """Build the search string for PRs by a batch of authors"""
         # Build search query - include all PR states but limit to recent activity
         # Sort by updated to get most recently active PRs first
         # Include PRs updated in the last 2 weeks to avoid too much old data
@@ -209,136 +309,88 @@ class GitHubGraphQLServiceV2:
         author_query = " ".join([f"author:{author}" for author in authors])
         search_query = f"org:{organization} type:pr {author_query} updated:>={two_weeks_ago} sort:updated"
         logger.info(f"GraphQL search query: {search_query}")
+        return search_query
+    
+    async def _post_graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a GraphQL query and return its data, raising on GraphQL errors"""
+        if not token_service.token:
+            raise ValueError("GitHub token not set")
+        token = token_service.token
         
-        query = """
-        query($searchQuery: String!, $cursor: String) {
-          search(query: $searchQuery, type: ISSUE, first: 100, after: $cursor) {
-            pageInfo {
-              hasNextPage
-              endCursor
-            }
-            nodes {
-              ... on PullRequest {
-                number
-                title
-                body
-                url
-                state
-                createdAt
-                updatedAt
-                isDraft
-                repository {
-                  id
-                  name
-                  owner {
-                    login
-                  }
-                  url
-                  description
-                  isPrivate
-                }
-                author {
-                  login
-                  ... on User {
-                    name
-                    avatarUrl
-                  }
-                }
-                assignees(first: 10) {
-                  nodes {
-                    login
-                    name
-                    avatarUrl
-                    url
-                  }
-                }
-                reviewRequests(first: 10) {
-                  nodes {
-                    requestedReviewer {
-                      ... on User {
-                        login
-                        name
-                        avatarUrl
-                        url
-                      }
-                      ... on Team {
-                        id
-                        name
-                        slug
-                        description
-                        privacy
-                      }
-                    }
-                  }
-                }
-                reviews(first: 20) {
-                  nodes {
-                    author {
-                      login
-                      ... on User {
-                        name
-                        avatarUrl
-                        url
-                      }
-                    }
-                    state
-                    submittedAt
-                  }
-                }
-                labels(first: 10) {
-                  nodes {
-                    name
-                  }
-                }
-              }
-            }
-          }
-        }
-        """
+        response = await self.client.post(
+            "https://api.github.com/graphql",
+            json={"query": query, "variables": variables},
+            headers={"Authorization": f"token {token}"}
+        )
+        response.raise_for_status()
         
+        data = response.json()
+        if "errors" in data:
+            logger.error(f"GraphQL errors: {data['errors']}")
+            raise Exception(f"GraphQL query failed: {data['errors']}")
+        return data["data"]
+    
+    def _convert_search_nodes(self, pr_nodes: List[Dict[str, Any]]) -> List[PullRequest]:
+        logger.info(f"GraphQL search returned {len(pr_nodes)} PR nodes")
+        prs = []
+        for pr_data in pr_nodes:
+            # Log PR details to debug why merged PRs might not show
+            pr_number = pr_data.get("number", "unknown")
+            pr_state = pr_data.get("state", "unknown")
+            pr_repo = pr_data.get("repository", {}).get("name", "unknown")
+            logger.info(f"Processing PR #{pr_number} in {pr_repo}: state={pr_state}")
+            
+            prs.append(self._convert_graphql_pr(pr_data))
+        return prs
+    
+    async def _fetch_search_pages(self, search_query: str, cursor: Optional[str] = None) -> List[PullRequest]:
+        """Fetch every page of a PR search, starting after cursor"""
         all_prs = []
-        cursor = None
         
         # Paginate through results
         while True:
-            response = await self.client.post(
-                "https://api.github.com/graphql",
-                json={
-                    "query": query,
-                    "variables": {
-                        "searchQuery": search_query,
-                        "cursor": cursor
-                    }
-                },
-                headers={"Authorization": f"token {token}"}
+            data = await self._post_graphql(
+                SEARCH_PAGE_QUERY,
+                {"searchQuery": search_query, "cursor": cursor}
             )
-            response.raise_for_status()
             
-            data = response.json()
-            if "errors" in data:
-                logger.error(f"GraphQL errors: {data['errors']}")
-                raise Exception(f"GraphQL query failed: {data['errors']}")
-            
-            search_results = data["data"]["search"]
-            pr_nodes = search_results["nodes"]
-            logger.info(f"GraphQL search returned {len(pr_nodes)} PR nodes")
-            
-            for pr_data in pr_nodes:
-                # Log PR details to debug why merged PRs might not show
-                pr_number = pr_data.get("number", "unknown")
-                pr_state = pr_data.get("state", "unknown")
-                pr_repo = pr_data.get("repository", {}).get("name", "unknown")
-                logger.info(f"Processing PR #{pr_number} in {pr_repo}: state={pr_state}")
-                
-                pr = self._convert_graphql_pr(pr_data)
-                all_prs.append(pr)
+            search_results = data["search"]
+            all_prs.extend(self._convert_search_nodes(search_results["nodes"]))
             
             if not search_results["pageInfo"]["hasNextPage"]:
                 break
             
             cursor = search_results["pageInfo"]["endCursor"]
         
-        logger.info(f"Total PRs found for authors {authors}: {len(all_prs)}")
+        return all_prs
+    
+    async def _fetch_prs_for_author_batches(self, batches: List[List[str]], organization: str) -> List[PullRequest]:
+        """
+        Fetch PRs for several author batches, running their first-page searches
+        as aliases of a single GraphQL request and paginating only where needed
+        """
+        search_queries = [self._author_search_query(batch, organization) for batch in batches]
+        all_prs = []
+        
+        for i in range(0, len(search_queries), SEARCHES_PER_REQUEST):
+            chunk = search_queries[i:i + SEARCHES_PER_REQUEST]
+            data = await self._post_graphql(
+                build_batched_search_query(len(chunk)),
+                {f"q{j}": search_query for j, search_query in enumerate(chunk)}
+            )
+            
+            for j, search_query in enumerate(chunk):
+                search_results = data[f"s{j}"]
+                prs = self._convert_search_nodes(search_results["nodes"])
+                
+                if search_results["pageInfo"]["hasNextPage"]:
+                    prs.extend(await self._fetch_search_pages(
+                        search_query, search_results["pageInfo"]["endCursor"]
+                    ))
+                
+                logger.info(f"Found {len(prs)} PRs for batch of {len(batches[i + j])} authors")
+                all_prs.extend(prs)
+        
         return all_prs
     
     def _determine_pr_state(self, pr_data: Dict[str, Any]) -> str:
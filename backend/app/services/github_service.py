@@ -1,3 +1,4 @@
+import asyncio
 import httpx
 import logging
 from typing import List, Optional, Dict, Any
@@ -8,15 +9,31 @@ from app.models.pr_models import (
     PullRequest, User, Repository, Review, Team, PRState, ReviewState, PRStatus
 )
 from app.services.token_service import token_service
+from app.services.http_client import get_transport
+from app.services.gh_cache import gh_cache
 
 logger = logging.getLogger(__name__)
 
+_request_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_request_semaphore() -> asyncio.Semaphore:
+    """Shared limit on concurrent per-item GitHub requests, to stay under secondary rate limits"""
+    global _request_semaphore
+    if _request_semaphore is None:
+        _request_semaphore = asyncio.Semaphore(settings.GITHUB_MAX_CONCURRENCY)
+    return _request_semaphore
+
 
 class GitHubService:
     def __init__(self):
         self.base_url = settings.GITHUB_API_BASE_URL
         self.current_user: Optional[User] = None
         self._client: Optional[httpx.AsyncClient] = None
+        # The token and transport the client was built with; either changing means a rebuild
+        self._client_token: Optional[str] = None
+        self._client_transport: Optional[httpx.AsyncHTTPTransport] = None
+        self._current_user_token: Optional[str] = None
     
     @property
     def client(self) -> httpx.AsyncClient:
@@ -24,14 +41,22 @@ class GitHubService:
         if not token_service.is_token_valid:
             raise ValueError("No valid GitHub token available. Please authenticate first.")
         
-        if self._client is None:
+        transport = get_transport()
+        if (
+            self._client is None
+            or self._client_token != token_service.token
+            or self._client_transport is not transport
+        ):
             headers = token_service.get_auth_headers()
             headers["User-Agent"] = "PR-Monitor-Backend/1.0"
             
             self._client = httpx.AsyncClient(
                 headers=headers,
-                timeout=30.0
+                timeout=30.0,
+                transport=transport
             )
+            self._client_token = token_service.token
+            self._client_transport = transport
         
         return self._client
     
@@ -39,18 +64,73 @@ class GitHubService:
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self._client:
-            await self._client.aclose()
-            self._client = None
+        # The client sits on the shared connection pool and is reused across
+        # requests, so there is nothing to close here
+        pass
+    
+    async def _bounded(self, coro):
+        """Await a coroutine while holding a slot of the shared GitHub concurrency limit"""
+        async with _get_request_semaphore():
+            return await coro
+    
+    async def _convert_all(self, conversions) -> List[PullRequest]:
+        """
+        Run PR conversions concurrently under the concurrency limit.
+        
+        Every conversion runs to completion, but any failure fails the whole batch: a partial
+        list would look complete, and closed-PR cleanup would delete the PRs missing from it.
+        """
+        results = await asyncio.gather(
+            *(self._bounded(conversion) for conversion in conversions),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return [pr for pr in results if isinstance(pr, PullRequest)]
+    
+    async def _get_json(self, url: str, params: Optional[Dict[str, Any]] = None, ttl: Optional[int] = None) -> Any:
+        """GET a GitHub resource through the response cache, revalidating stale entries with ETags"""
+        if ttl is None:
+            ttl = settings.GITHUB_CACHE_TTL_SECONDS
+        
+        key = gh_cache.make_key(url, params, token_service.token)
+        async with gh_cache.lock(key):
+            entry = gh_cache.get(key)
+            if entry and entry.is_fresh:
+                return entry.data
+            
+            headers = {"If-None-Match": entry.etag} if entry and entry.etag else None
+            response = await self.client.get(url, params=params, headers=headers)
+            
+            # 304s are free against the rate limit and carry no body
+            if response.status_code == 304 and entry:
+                entry.touch()
+                return entry.data
+            
+            # Credentials were rejected, so anything memoized for them is suspect
+            if response.status_code == 401:
+                gh_cache.invalidate(key)
+                self.current_user = None
+            
+            response.raise_for_status()
+            data = response.json()
+            gh_cache.set(key, data, ttl, response.headers.get("ETag"))
+            return data
     
     async def get_current_user(self) -> Optional[User]:
-        if self.current_user:
+        # A memoized user only holds for the token it was looked up with
+        if self.current_user and self._current_user_token == token_service.token:
             return self.current_user
             
         try:
-            response = await self.client.get(f"{self.base_url}/user")
-            response.raise_for_status()
-            user_data = response.json()
+            # The token service already fetched /user when the token was validated,
+            # so only hit GitHub if that isn't available
+            user_data = token_service.user_info
+            if not user_data:
+                user_data = await self._get_json(
+                    f"{self.base_url}/user", ttl=settings.GITHUB_METADATA_CACHE_TTL_SECONDS
+                )
             
             self.current_user = User(
                 id=user_data["id"],
@@ -58,6 +138,7 @@ class GitHubService:
                 avatar_url=user_data["avatar_url"],
                 html_url=user_data["html_url"]
             )
+            self._current_user_token = token_service.token
             return self.current_user
         except Exception as e:
             logger.error(f"Failed to get current user: {e}")
@@ -65,9 +146,9 @@ class GitHubService:
     
     async def get_repository(self, repo_name: str) -> Optional[Repository]:
         try:
-            response = await self.client.get(f"{self.base_url}/repos/{repo_name}")
-            response.raise_for_status()
-            repo_data = response.json()
+            repo_data = await self._get_json(
+                f"{self.base_url}/repos/{repo_name}", ttl=settings.GITHUB_METADATA_CACHE_TTL_SECONDS
+            )
             
             return Repository(
                 id=repo_data["id"],
@@ -83,24 +164,26 @@ class GitHubService:
     
     async def get_pull_requests(self, repo_name: str, state: str = "open") -> List[PullRequest]:
         try:
-            response = await self.client.get(
-                f"{self.base_url}/repos/{repo_name}/pulls",
-                params={"state": state, "sort": "updated", "direction": "desc"}
+            # The PR list and repository metadata are independent, fetch them together
+            prs_data, repository = await asyncio.gather(
+                self._get_json(
+                    f"{self.base_url}/repos/{repo_name}/pulls",
+                    params={"state": state, "sort": "updated", "direction": "desc"}
+                ),
+                self.get_repository(repo_name)
             )
-            response.raise_for_status()
-            prs_data = response.json()
             
-            repository = await self.get_repository(repo_name)
             if not repository:
                 return []
             
-            pull_requests = []
-            for pr_data in prs_data:
-                pr = await self._convert_pr_data(pr_data, repository)
-                if pr:
-                    pull_requests.append(pr)
+            # Resolve the current user once up front so the concurrent conversions
+            # below all hit the memoized value instead of racing to fetch it
+            if not await self.get_current_user():
+                return []
             
-            return pull_requests
+            return await self._convert_all(
+                self._convert_pr_data(pr_data, repository) for pr_data in prs_data
+            )
         except Exception as e:
             logger.error(f"Failed to get pull requests for {repo_name}: {e}")
             return []
@@ -400,26 +483,29 @@ class GitHubService:
             response.raise_for_status()
             search_data = response.json()
             
-            pull_requests = []
-            for item in search_data.get("items", []):
-                # Extract repo name from URL
-                repo_full_name = "/".join(item["repository_url"].split("/")[-2:])
-                
-                # Get repository info
-                repository = await self.get_repository(repo_full_name)
-                if not repository:
-                    continue
-                
-                # Convert to our PR format
-                pr = await self._convert_search_result_to_pr(item, repository)
-                if pr:
-                    pull_requests.append(pr)
-            
-            return pull_requests
+            return await self._convert_search_results(search_data.get("items", []))
         except Exception as e:
             logger.error(f"Failed to get team pull requests for {org}/{team_slug}: {e}")
             return []
     
+    async def _convert_search_results(self, items: List[Dict[str, Any]]) -> List[PullRequest]:
+        """Convert search result items to PullRequest objects concurrently"""
+        if not items or not await self.get_current_user():
+            return []
+        
+        return await self._convert_all(self._build_search_result_pr(item) for item in items)
+    
+    async def _build_search_result_pr(self, item: Dict[str, Any]) -> Optional[PullRequest]:
+        """Fetch repository info for a search result item and convert it to our PR format"""
+        # Extract repo name from URL
+        repo_full_name = "/".join(item["repository_url"].split("/")[-2:])
+        
+        repository = await self.get_repository(repo_full_name)
+        if not repository:
+            return None
+        
+        return await self._convert_search_result_to_pr(item, repository)
+    
     async def _convert_search_result_to_pr(self, item: Dict[str, Any], repository: Repository) -> Optional[PullRequest]:
         """Convert GitHub search result to PullRequest object"""
         try:
@@ -451,22 +537,7 @@ class GitHubService:
             response.raise_for_status()
             search_data = response.json()
             
-            pull_requests = []
-            for item in search_data.get("items", []):
-                # Extract repo name from URL
-                repo_full_name = "/".join(item["repository_url"].split("/")[-2:])
-                
-                # Get repository info
-                repository = await self.get_repository(repo_full_name)
-                if not repository:
-                    continue
-                
-                # Convert to our PR format
-                pr = await self._convert_search_result_to_pr(item, repository)
-                if pr:
-                    pull_requests.append(pr)
-            
-            return pull_requests
+            return await self._convert_search_results(search_data.get("items", []))
         except Exception as e:
             logger.error(f"Failed to search pull requests for user {username}: {e}")
             return []
@@ -474,43 +545,43 @@ class GitHubService:
     async def get_current_user_teams(self) -> List[Dict[str, Any]]:
         """Get all teams that the current user belongs to"""
         try:
-            # Get all organizations the user belongs to
-            response = await self.client.get(f"{self.base_url}/user/orgs")
-            response.raise_for_status()
-            orgs = response.json()
-            
-            all_teams = []
+            # /user/teams already spans every organization, and each team carries its
+            # organization, so one request replaces a per-org loop of round-trips
+            teams = await self._get_json(
+                f"{self.base_url}/user/teams",
+                params={"per_page": 100},
+                ttl=settings.GITHUB_METADATA_CACHE_TTL_SECONDS
+            )
             
-            for org in orgs:
-                org_login = org["login"]
-                try:
-                    # Get teams for this organization that the user belongs to
-                    teams_response = await self.client.get(
-                        f"{self.base_url}/user/teams",
-                        params={"org": org_login}
-                    )
-                    teams_response.raise_for_status()
-                    teams = teams_response.json()
-                    
-                    for team in teams:
-                        team_info = {
-                            "organization": org_login,
-                            "team_name": team["slug"],
-                            "team_id": team["id"],
-                            "name": team["name"],
-                            "description": team.get("description"),
-                            "privacy": team.get("privacy", "closed"),
-                            "permission": team.get("permission", "pull")
-                        }
-                        all_teams.append(team_info)
-                        
-                except Exception as e:
-                    logger.warning(f"Failed to get teams for organization {org_login}: {e}")
-                    continue
+            all_teams = [
+                {
+                    "organization": team["organization"]["login"],
+                    "team_name": team["slug"],
+                    "team_id": team["id"],
+                    "name": team["name"],
+                    "description": team.get("description"),
+                    "privacy": team.get("privacy", "closed"),
+                    "permission": team.get("permission", "pull")
+                }
+                for team in teams
+                if team.get("organization")
+            ]
             
             logger.info(f"Found {len(all_teams)} teams for current user")
             return all_teams
             
         except Exception as e:
             logger.error(f"Failed to get current user teams: {e}")
-            return []
\ No newline at end of file
+            return []
+
+
+# Shared instance; its client is rebuilt whenever the token changes
+_github_service: Optional[GitHubService] = None
+
+
+def get_github_service() -> GitHubService:
+    """FastAPI dependency providing the shared GitHubService backed by the shared connection pool"""
+    global _github_service
+    if _github_service is None:
+        _github_service = GitHubService()
+    return _github_service
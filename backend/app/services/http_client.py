@@ -0,0 +1,56 @@
+"""
+Shared HTTP connection pool for outbound GitHub API requests.
+"""
+
+import logging
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_transport: Optional[httpx.AsyncHTTPTransport] = None
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_transport() -> httpx.AsyncHTTPTransport:
+    """
+    Get the process-wide HTTP transport, creating it on first use.
+
+    Clients built on top of this transport share one keep-alive connection
+    pool, so repeated requests to api.github.com skip DNS and TLS setup.
+    Clients using it must not be closed, as that would close the pool.
+    """
+    global _transport
+    if _transport is None:
+        _transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=75
+            )
+        )
+        logger.info("Created shared HTTP connection pool")
+    return _transport
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Get a process-wide client on the shared transport, for one-off requests
+    that pass their own headers (e.g. validating a token before it is stored).
+    """
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(timeout=30.0, transport=get_transport())
+    return _client
+
+
+async def close_transport():
+    """Close the shared HTTP transport on application shutdown"""
+    global _transport, _client
+    # The client only wraps the transport, which is closed below
+    _client = None
+    if _transport is not None:
+        await _transport.aclose()
+        _transport = None
+        logger.info("Closed shared HTTP connection pool")
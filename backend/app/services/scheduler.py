@@ -1,28 +1,39 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Set, List, Optional, Any
+from enum import Enum
+from typing import Dict, FrozenSet, Set, List, Optional, Any, Tuple
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
 from app.core.config import settings
-from app.services.github_service import GitHubService
+from app.services.github_service import get_github_service
 from app.services.github_graphql_service_v2 import GitHubGraphQLServiceV2
 from app.services.websocket_manager import websocket_manager
 from app.services.database_service import DatabaseService
 from app.services.token_service import token_service
-from app.database.database import get_db
-from app.models.pr_models import PullRequest, TeamSubscription, PRStatus
+from app.database.database import AsyncSessionLocal
+from app.models.pr_models import PullRequest, TeamSubscription, PRState, PRStatus
 from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
 
 
+class RefreshResult(str, Enum):
+    OK = "ok"
+    NOT_SUBSCRIBED = "not_subscribed"
+    DISABLED = "disabled"
+
+
 class PRMonitorScheduler:
     def __init__(self):
         self.scheduler = AsyncIOScheduler()
         self.subscribed_teams: Dict[str, TeamSubscription] = {}  # Key: "org/team"
+        self._team_keys: FrozenSet[str] = frozenset()  # Snapshot of subscribed_teams keys, rebuilt on add/remove
+        # Bumped whenever stored PRs or the set of teams change, so readers can tell if derived data is stale
+        self.pr_data_version = 0
         self.is_running = False
+        self._refresh_tasks: Set[asyncio.Task] = set()  # Strong refs to refreshes started by request_team_refresh
         
         # Register callback for when token is set
         token_service.add_token_set_callback(self._on_token_set)
@@ -63,16 +74,27 @@ class PRMonitorScheduler:
     def add_team_subscription(self, subscription: TeamSubscription):
         team_key = f"{subscription.organization}/{subscription.team_name}"
         self.subscribed_teams[team_key] = subscription
+        self._team_keys = frozenset(self.subscribed_teams)
+        self.pr_data_version += 1
         logger.info(f"Added team subscription: {team_key}")
     
     def remove_team_subscription(self, organization: str, team_name: str):
         team_key = f"{organization}/{team_name}"
         if team_key in self.subscribed_teams:
             del self.subscribed_teams[team_key]
+            self._team_keys = frozenset(self.subscribed_teams)
+        self.pr_data_version += 1
         logger.info(f"Removed team subscription: {team_key}")
     
-    def get_subscribed_teams(self) -> List[str]:
-        return list(self.subscribed_teams.keys())
+    def get_subscribed_teams(self) -> FrozenSet[str]:
+        """Get the subscribed team keys as a shared immutable snapshot (no per-call copy)"""
+        return self._team_keys
+    
+    def is_team_subscribed(self, team_key: str) -> bool:
+        return team_key in self.subscribed_teams
+    
+    def get_team_subscription(self, team_key: str) -> Optional[TeamSubscription]:
+        return self.subscribed_teams.get(team_key)
     
     async def poll_team_repositories(self):
         """Poll all subscribed teams using efficient GraphQL API (1 API call per org)"""
@@ -83,69 +105,106 @@ class PRMonitorScheduler:
         logger.info(f"Team-based polling for {len(self.subscribed_teams)} teams")
         
         graphql_service = GitHubGraphQLServiceV2()
+        # Team stats rows from this poll, written together once every team is done
+        pending_stats: List[dict] = []
         try:
-            # Process only subscribed teams
-            for team_key, subscription in self.subscribed_teams.items():
+            # Process only subscribed teams (snapshot, since subscriptions can change mid-poll)
+            for team_key, subscription in list(self.subscribed_teams.items()):
                 if not subscription.enabled:
                     continue
                 
                 try:
-                    org, team_slug = team_key.split('/', 1)
-                    logger.info(f"Fetching PRs for team {team_key} with GraphQL...")
-                    prs = await graphql_service.get_team_pull_requests(org, team_slug)
-                    
-                    # Update user-specific fields for GraphQL PRs
-                    await self._update_user_specific_fields(prs)
-                    
-                    # Get previous PRs from database for comparison
-                    async for db in get_db():
-                        previous_prs = await self._get_team_prs_from_database(db, team_key)
-                        break
-                    
-                    new_prs = []
-                    updated_prs = []
-                    closed_prs = []
-                    
-                    current_pr_numbers = {pr.number for pr in prs}
-                    previous_pr_numbers = {pr.number for pr in previous_prs}
-                    
-                    # Create lookup for previous PRs by number
-                    previous_pr_map = {pr.number: pr for pr in previous_prs}
-                    
-                    for pr in prs:
-                        if pr.number not in previous_pr_map:
-                            new_prs.append(pr)
-                            logger.info(f"Found genuinely NEW PR: {team_key} PR#{pr.number}")
-                        elif pr.updated_at != previous_pr_map[pr.number].updated_at:
-                            updated_prs.append(pr)
-                    
-                    for pr_number in previous_pr_numbers - current_pr_numbers:
-                        closed_prs.append(previous_pr_map[pr_number])
-                    
-                    # Save PRs to database using GraphQL-specific method
-                    async for db in get_db():
-                        db_service = DatabaseService(db)
-                        pr_dicts = [pr.dict() for pr in prs]
-                        await db_service.upsert_pull_requests_graphql(pr_dicts, team_key)
-                        logger.info(f"Saved {len(pr_dicts)} PRs to database for team {team_key}")
-                        break
-                    
-                    # Log discovered repositories from team PRs (no subscriptions created)
-                    await self._log_discovered_repositories_from_prs(prs)
-                    
-                    # Send notifications and updates
-                    await self._handle_team_pr_changes(
-                        team_key, subscription, 
-                        new_prs, updated_prs, closed_prs
-                    )
-                    
-                    await self._send_team_stats_update(org, team_slug, prs)
-                            
+                    await self._poll_team(graphql_service, team_key, subscription, pending_stats)
                 except Exception as e:
                     logger.error(f"Error fetching PRs for team {team_key}: {e}")
             
         finally:
             await graphql_service.close()
+            await self._save_team_stats(pending_stats)
+
+    async def _poll_team(
+        self,
+        graphql_service: GitHubGraphQLServiceV2,
+        team_key: str,
+        subscription: TeamSubscription,
+        pending_stats: Optional[List[dict]] = None
+    ) -> bool:
+        """
+        Fetch, store and broadcast the current PRs for a single team; returns whether any PR changed.
+        
+        If pending_stats is given the team's stats row is appended to it for the caller to save,
+        otherwise it is saved immediately.
+        """
+        org, team_slug = team_key.split('/', 1)
+        logger.info(f"Fetching PRs for team {team_key} with GraphQL...")
+        prs = await graphql_service.get_team_pull_requests(org, team_slug)
+        
+        # Update user-specific fields for GraphQL PRs
+        await self._update_user_specific_fields(prs)
+        
+        # Compare against every PR stored for the team, not just open ones: the poll also returns PRs
+        # merged or closed in the last two weeks, which would otherwise look new on every poll
+        async with AsyncSessionLocal() as db:
+            previous_prs = await self._get_team_prs_from_database(db, team_key)
+        
+        new_prs = []
+        updated_prs = []
+        closed_prs = []
+        
+        # Key by repository too, since PR numbers repeat across a team's repositories
+        current_pr_keys = {(pr.repository.full_name, pr.number) for pr in prs}
+        previous_pr_map = {(pr.repository.full_name, pr.number): pr for pr in previous_prs}
+        
+        for pr in prs:
+            previous = previous_pr_map.get((pr.repository.full_name, pr.number))
+            if previous is None:
+                new_prs.append(pr)
+                logger.info(f"Found genuinely NEW PR: {team_key} PR#{pr.number}")
+            elif pr.updated_at != previous.updated_at:
+                updated_prs.append(pr)
+        
+        # Stored open PRs the poll no longer returns
+        for key, previous in previous_pr_map.items():
+            if key not in current_pr_keys and previous.state == PRState.OPEN:
+                closed_prs.append(previous)
+        
+        # Stored PRs only need rewriting if GitHub's view or the user's involvement changed
+        changed = bool(new_prs or updated_prs) or any(
+            self._user_fields_changed(pr, previous_pr_map[(pr.repository.full_name, pr.number)]) for pr in prs
+        )
+        
+        if changed:
+            # Save PRs to database using GraphQL-specific method
+            async with AsyncSessionLocal() as db:
+                db_service = DatabaseService(db)
+                pr_dicts = [pr.dict() for pr in prs]
+                await db_service.upsert_pull_requests_graphql(pr_dicts, team_key)
+                logger.info(f"Saved {len(pr_dicts)} PRs to database for team {team_key}")
+            self.pr_data_version += 1
+        else:
+            logger.info(f"No PR changes for team {team_key}, skipping database write")
+        
+        # Log discovered repositories from team PRs (no subscriptions created)
+        await self._log_discovered_repositories_from_prs(prs)
+        
+        # Send notifications and updates
+        await self._handle_team_pr_changes(
+            team_key, subscription, 
+            new_prs, updated_prs, closed_prs
+        )
+        
+        await self._send_team_stats_update(org, team_slug, prs, pending_stats)
+        return changed
+    
+    @staticmethod
+    def _user_fields_changed(pr: PullRequest, previous: PullRequest) -> bool:
+        """Check the computed per-user fields, which can change without GitHub bumping updated_at"""
+        return (
+            pr.status != previous.status
+            or pr.user_has_reviewed != previous.user_has_reviewed
+            or pr.user_is_assigned != previous.user_is_assigned
+            or pr.user_is_requested_reviewer != previous.user_is_requested_reviewer
+        )
 
     async def _handle_team_pr_changes(
         self,
@@ -155,22 +214,20 @@ class PRMonitorScheduler:
         updated_prs: List[PullRequest],
         closed_prs: List[PullRequest]
     ):
+        updates = []
         for pr in new_prs:
             if self._should_notify_for_team_pr(pr, subscription):
-                await websocket_manager.send_team_pr_update(
-                    team_key, pr.model_dump(), "new_pr"
-                )
+                updates.append((pr.model_dump(), "new_pr"))
         
         for pr in updated_prs:
             if self._should_notify_for_team_pr(pr, subscription):
-                await websocket_manager.send_team_pr_update(
-                    team_key, pr.model_dump(), "updated"
-                )
+                updates.append((pr.model_dump(), "updated"))
         
         for pr in closed_prs:
-            await websocket_manager.send_team_pr_update(
-                team_key, pr.model_dump(), "closed"
-            )
+            updates.append((pr.model_dump(), "closed"))
+        
+        # One frame per poll rather than one per PR
+        await websocket_manager.send_team_pr_updates(team_key, updates)
     
     def _should_notify_for_team_pr(self, pr: PullRequest, subscription: TeamSubscription) -> bool:
         if subscription.watch_all_prs:
@@ -184,49 +241,101 @@ class PRMonitorScheduler:
         
         return False
     
-    async def _send_team_stats_update(self, organization: str, team_name: str, prs: List[PullRequest]):
+    async def _send_team_stats_update(
+        self,
+        organization: str,
+        team_name: str,
+        prs: List[PullRequest],
+        pending_stats: Optional[List[dict]] = None
+    ):
         try:
+            # Count both stats in a single pass over the PRs
+            assigned_to_user = 0
+            review_requests = 0
+            for pr in prs:
+                if pr.user_is_assigned:
+                    assigned_to_user += 1
+                if pr.user_is_requested_reviewer:
+                    review_requests += 1
+            
+            last_updated = datetime.now(timezone.utc)
             stats = {
                 "total_open_prs": len(prs),
-                "assigned_to_user": len([pr for pr in prs if pr.user_is_assigned]),
-                "review_requests": len([pr for pr in prs if pr.user_is_requested_reviewer]),
-                "last_updated": datetime.now(timezone.utc).isoformat()
+                "assigned_to_user": assigned_to_user,
+                "review_requests": review_requests,
+                "last_updated": last_updated.isoformat()
             }
             
-            # Update database with team stats
-            async for db in get_db():
-                db_service = DatabaseService(db)
-                await db_service.update_team_stats(
-                    organization=organization,
-                    team_name=team_name,
-                    total_open_prs=stats["total_open_prs"],
-                    assigned_to_user=stats["assigned_to_user"],
-                    review_requests=stats["review_requests"]
-                )
-                break
+            # Update database with team stats, now or with the rest of the poll
+            row = {
+                "organization": organization,
+                "team_name": team_name,
+                "total_open_prs": stats["total_open_prs"],
+                "assigned_to_user": stats["assigned_to_user"],
+                "review_requests": stats["review_requests"],
+                "last_updated": last_updated
+            }
+            if pending_stats is None:
+                await self._save_team_stats([row])
+            else:
+                pending_stats.append(row)
             
             await websocket_manager.send_team_stats_update(organization, team_name, stats)
         except Exception as e:
             logger.error(f"Failed to send team stats update for {organization}/{team_name}: {e}")
+    
+    async def _save_team_stats(self, rows: List[dict]):
+        """Write team stats rows in a single upsert"""
+        if not rows:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                await DatabaseService(db).update_team_stats_many(rows)
+        except Exception as e:
+            logger.error(f"Failed to save stats for {len(rows)} teams: {e}")
 
-    async def force_refresh_team(self, organization: str, team_name: str):
+    async def force_refresh_team(self, organization: str, team_name: str) -> RefreshResult:
         team_key = f"{organization}/{team_name}"
-        if team_key not in self.subscribed_teams:
+        result, subscription = self._refresh_target(team_key)
+        if result is RefreshResult.OK:
+            await self._refresh_team(team_key, subscription)
+        return result
+    
+    def request_team_refresh(self, organization: str, team_name: str) -> RefreshResult:
+        """Start refreshing a team in the background, or report why it can't be refreshed"""
+        team_key = f"{organization}/{team_name}"
+        result, subscription = self._refresh_target(team_key)
+        if result is RefreshResult.OK:
+            task = asyncio.create_task(self._refresh_team(team_key, subscription))
+            self._refresh_tasks.add(task)
+            task.add_done_callback(self._refresh_tasks.discard)
+        return result
+    
+    def _refresh_target(self, team_key: str) -> Tuple[RefreshResult, Optional[TeamSubscription]]:
+        """Look up the subscription to refresh once, so it can't vanish between the check and the poll"""
+        subscription = self.subscribed_teams.get(team_key)
+        if subscription is None:
             logger.warning(f"Team {team_key} is not subscribed")
-            return
-        
-        subscription = self.subscribed_teams[team_key]
+            return RefreshResult.NOT_SUBSCRIBED, None
         if not subscription.enabled:
             logger.warning(f"Team {team_key} is disabled")
-            return
-        
-        async with GitHubService() as github_service:
-            await self._poll_team(github_service, team_key, subscription)
+            return RefreshResult.DISABLED, None
+        return RefreshResult.OK, subscription
+    
+    async def _refresh_team(self, team_key: str, subscription: TeamSubscription):
+        graphql_service = GitHubGraphQLServiceV2()
+        try:
+            if not await self._poll_team(graphql_service, team_key, subscription):
+                logger.info(f"Refresh of team {team_key} found no changes")
+        except Exception as e:
+            logger.error(f"Error refreshing PRs for team {team_key}: {e}")
+        finally:
+            await graphql_service.close()
     
     async def _load_existing_team_subscriptions(self):
         """Load existing team subscriptions from database on startup and auto-subscribe to user teams"""
         try:
-            async for db in get_db():
+            async with AsyncSessionLocal() as db:
                 db_service = DatabaseService(db)
                 
                 # Load existing team subscriptions only
@@ -238,7 +347,6 @@ class PRMonitorScheduler:
                 
                 # Check if we need to poll immediately based on last update times
                 await self._check_and_poll_if_needed(db_service)
-                break
             
             # Auto-subscribe to user's teams if enabled
             if settings.AUTO_SUBSCRIBE_USER_TEAMS:
@@ -281,11 +389,11 @@ class PRMonitorScheduler:
     async def _auto_subscribe_user_teams(self):
         """Automatically subscribe to all teams the user belongs to"""
         try:
-            async with GitHubService() as github_service:
+            async with get_github_service() as github_service:
                 user_teams = await github_service.get_current_user_teams()
                 
                 new_subscriptions = 0
-                async for db in get_db():
+                async with AsyncSessionLocal() as db:
                     db_service = DatabaseService(db)
                     
                     for team_info in user_teams:
@@ -322,8 +430,6 @@ class PRMonitorScheduler:
                         new_subscriptions += 1
                         
                         logger.info(f"Auto-subscribed to team: {team_key}")
-                    
-                    break
                 
                 if new_subscriptions > 0:
                     logger.info(f"Auto-subscribed to {new_subscriptions} new user teams")
@@ -364,20 +470,23 @@ class PRMonitorScheduler:
         if not current_user:
             return
         
+        user_login = current_user["login"]
+        github_service = get_github_service()
+        
         for pr in prs:
             # Check if current user has reviewed
             pr.user_has_reviewed = any(
-                review.user.login == current_user["login"] for review in pr.reviews
+                review.user.login == user_login for review in pr.reviews
             )
             
             # Check if current user is assigned
             pr.user_is_assigned = any(
-                assignee.login == current_user["login"] for assignee in pr.assignees
+                assignee.login == user_login for assignee in pr.assignees
             )
             
             # Check if current user is requested reviewer (individual or team)
             pr.user_is_requested_reviewer = any(
-                reviewer.login == current_user["login"] for reviewer in pr.requested_reviewers
+                reviewer.login == user_login for reviewer in pr.requested_reviewers
             )
             
             # Also check if user is part of any requested teams
@@ -387,7 +496,6 @@ class PRMonitorScheduler:
                 pr.user_is_requested_reviewer = True
             
             # Update status based on user involvement
-            github_service = GitHubService()
             pr.status = github_service._determine_pr_status(
                 pr.state, pr.reviews, pr.user_has_reviewed, pr.user_is_assigned, pr.user_is_requested_reviewer
             )
@@ -412,15 +520,10 @@ class PRMonitorScheduler:
         """Get PRs from database for a team"""
         try:
             db_service = DatabaseService(db)
-            pr_dicts = await db_service.get_team_pull_requests(team_key, state="open")
-            
-            # Convert dicts to PullRequest objects
-            prs = []
-            for pr_dict in pr_dicts:
-                pr = PullRequest(**pr_dict)
-                prs.append(pr)
+            pr_jsons = await db_service.get_team_pull_requests_json(team_key)
             
-            return prs
+            # Validate straight from the stored JSON text, skipping the intermediate dicts
+            return [PullRequest.model_validate_json(pr_json) for pr_json in pr_jsons]
         except Exception as e:
             logger.error(f"Error getting team PRs from database: {e}")
             return []
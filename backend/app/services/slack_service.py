@@ -1,7 +1,7 @@
 import httpx
 import logging
 from typing import Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
 
 from app.core.config import settings
 from app.models.pr_models import PullRequest
@@ -106,7 +106,7 @@ class SlackService:
                         }
                     ],
                     "footer": "PR Monitor",
-                    "ts": int(datetime.utcnow().timestamp())
+                    "ts": int(datetime.now(timezone.utc).timestamp())
                 }
             ]
         }
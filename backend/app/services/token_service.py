@@ -4,10 +4,11 @@ Token management service for handling GitHub authentication tokens dynamically.
 
 import asyncio
 from typing import Optional, Dict, Any
-import aiohttp
 import logging
 from datetime import datetime, timezone
 
+from app.services.http_client import get_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -92,42 +93,41 @@ class TokenService:
                 'User-Agent': 'PR-Monitor-App'
             }
             
-            async with aiohttp.ClientSession() as session:
-                # Test token by getting authenticated user info
-                async with session.get('https://api.github.com/user', headers=headers) as response:
-                    if response.status == 200:
-                        self._user_info = await response.json()
-                        self._last_validated = datetime.now(timezone.utc)
-                        
-                        # Also check token scopes
-                        scopes = response.headers.get('X-OAuth-Scopes', '')
-                        logger.info(f"Token scopes: {scopes}")
-                        
-                        # Verify we have necessary permissions
-                        required_scopes = ['repo', 'user']
-                        available_scopes = [scope.strip() for scope in scopes.split(',') if scope.strip()]
-                        
-                        # Check if we have the required scopes (repo includes public_repo)
-                        has_repo = 'repo' in available_scopes or 'public_repo' in available_scopes
-                        has_user = 'user' in available_scopes or 'user:email' in available_scopes
-                        
-                        if not (has_repo and has_user):
-                            logger.warning(f"Token missing required scopes. Has: {available_scopes}, Needs: {required_scopes}")
-                            return False
-                        
-                        return True
-                    elif response.status == 401:
-                        logger.error("GitHub token is invalid or expired")
-                        return False
-                    elif response.status == 403:
-                        logger.warning("GitHub API rate limit exceeded")
-                        # For rate limiting, we don't invalidate the token
-                        # The frontend should handle this differently
-                        return False
-                    else:
-                        logger.error(f"GitHub API error: {response.status}")
-                        return False
-                        
+            # Test token by getting authenticated user info (over the shared connection pool)
+            response = await get_client().get('https://api.github.com/user', headers=headers)
+            if response.status_code == 200:
+                self._user_info = response.json()
+                self._last_validated = datetime.now(timezone.utc)
+                
+                # Also check token scopes
+                scopes = response.headers.get('X-OAuth-Scopes', '')
+                logger.info(f"Token scopes: {scopes}")
+                
+                # Verify we have necessary permissions
+                required_scopes = ['repo', 'user']
+                available_scopes = [scope.strip() for scope in scopes.split(',') if scope.strip()]
+                
+                # Check if we have the required scopes (repo includes public_repo)
+                has_repo = 'repo' in available_scopes or 'public_repo' in available_scopes
+                has_user = 'user' in available_scopes or 'user:email' in available_scopes
+                
+                if not (has_repo and has_user):
+                    logger.warning(f"Token missing required scopes. Has: {available_scopes}, Needs: {required_scopes}")
+                    return False
+                
+                return True
+            elif response.status_code == 401:
+                logger.error("GitHub token is invalid or expired")
+                return False
+            elif response.status_code == 403:
+                logger.warning("GitHub API rate limit exceeded")
+                # For rate limiting, we don't invalidate the token
+                # The frontend should handle this differently
+                return False
+            else:
+                logger.error(f"GitHub API error: {response.status_code}")
+                return False
+                
         except Exception as e:
             logger.error(f"Error validating GitHub token: {str(e)}")
             return False
@@ -144,6 +144,15 @@ class TokenService:
         
         return await self._validate_token()
     
+    def mark_validated(self, user_info: Dict[str, Any]):
+        """Record a successful validation made outside this service"""
+        self._user_info = user_info
+        self._last_validated = datetime.now(timezone.utc)
+    
+    def expire_validation(self):
+        """Forget the last successful validation, so the next check goes back to GitHub"""
+        self._last_validated = None
+    
     def clear_token(self):
         """Clear the current token and user info"""
         self._token = None
@@ -1,30 +1,53 @@
+import asyncio
 import json
 import logging
-from typing import List, Dict, Set
+from typing import Any, List, Dict, Optional, Set, Tuple, Union
+import orjson
 from fastapi import WebSocket, WebSocketDisconnect
-from datetime import datetime
+from datetime import datetime, timezone
 
 from app.models.pr_models import WebSocketMessage
 
 logger = logging.getLogger(__name__)
 
+# Outbound messages buffered per connection; a client this far behind is dropped instead of stalling others
+SEND_QUEUE_SIZE = 64
+# A single frame that can't be written within this time means the client has stopped reading
+SEND_TIMEOUT_SECONDS = 10.0
+
 
 class WebSocketManager:
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
         self.user_subscriptions: Dict[str, Set[str]] = {}  # repo subscriptions
         self.user_team_subscriptions: Dict[str, Set[str]] = {}  # team subscriptions
+        # Reverse index of user_team_subscriptions, so team fanout only visits interested users
+        self.team_rooms: Dict[str, Set[str]] = {}  # team_key -> user_ids
+        # Users that haven't joined any team room; they keep receiving every team update
+        self.unscoped_users: Set[str] = set()
+        # Each connection has its own queue drained by a writer task, so sending never blocks the caller
+        self.send_queues: Dict[str, asyncio.Queue] = {}
+        self.writer_tasks: Dict[str, asyncio.Task] = {}
     
     async def connect(self, websocket: WebSocket, user_id: str):
         await websocket.accept()
+        # A reconnect replaces the previous socket's writer
+        self._stop_writer(user_id)
         self.active_connections[user_id] = websocket
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.send_queues[user_id] = queue
+        self.writer_tasks[user_id] = asyncio.create_task(self._writer(user_id, websocket, queue))
         self.user_subscriptions[user_id] = set()
+        # A reconnect starts unscoped, so drop room memberships left from the previous socket
+        for team_key in self.user_team_subscriptions.get(user_id, ()):
+            self._leave_room(user_id, team_key)
         self.user_team_subscriptions[user_id] = set()
+        self.unscoped_users.add(user_id)
         logger.info(f"WebSocket connection established for user: {user_id}")
         
-        await self.send_message(user_id, WebSocketMessage(
-            type="connection_established",
-            data={"user_id": user_id, "message": "Connected successfully"}
+        await self.send_message(user_id, self._build_message(
+            "connection_established",
+            {"user_id": user_id, "message": "Connected successfully"}
         ))
     
     def disconnect(self, user_id: str):
@@ -32,39 +55,110 @@ class WebSocketManager:
             del self.active_connections[user_id]
         if user_id in self.user_subscriptions:
             del self.user_subscriptions[user_id]
-        if user_id in self.user_team_subscriptions:
-            del self.user_team_subscriptions[user_id]
+        for team_key in self.user_team_subscriptions.pop(user_id, ()):
+            self._leave_room(user_id, team_key)
+        self.unscoped_users.discard(user_id)
+        self._stop_writer(user_id)
         logger.info(f"WebSocket connection closed for user: {user_id}")
     
-    async def send_message(self, user_id: str, message: WebSocketMessage):
-        if user_id in self.active_connections:
+    def _stop_writer(self, user_id: str):
+        self.send_queues.pop(user_id, None)
+        task = self.writer_tasks.pop(user_id, None)
+        # The writer may be the one disconnecting after a failed send; it returns on its own
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+    
+    async def _writer(self, user_id: str, websocket: WebSocket, queue: asyncio.Queue):
+        """Drain one connection's queue onto its socket, dropping the connection if a send fails"""
+        while True:
+            payload = await queue.get()
             try:
-                websocket = self.active_connections[user_id]
-                await websocket.send_text(message.model_dump_json())
+                await asyncio.wait_for(websocket.send_text(payload), SEND_TIMEOUT_SECONDS)
             except Exception as e:
                 logger.error(f"Failed to send message to {user_id}: {e}")
-                self.disconnect(user_id)
+                self._drop(user_id, websocket)
+                return
     
-    async def broadcast_to_subscribers(self, repository_name: str, message: WebSocketMessage):
-        for user_id, subscriptions in self.user_subscriptions.items():
-            if repository_name in subscriptions:
-                await self.send_message(user_id, message)
+    def send_text(self, user_id: str, payload: str):
+        """Queue text for one user, dropping them if they have fallen too far behind"""
+        queue = self.send_queues.get(user_id)
+        if queue is None:
+            return
+        try:
+            queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            logger.warning(f"Dropping slow WebSocket client {user_id}")
+            self._drop(user_id, self.active_connections.get(user_id))
     
-    async def broadcast_to_team_subscribers(self, team_key: str, message: WebSocketMessage):
-        for user_id, team_subscriptions in self.user_team_subscriptions.items():
-            if team_key in team_subscriptions:
-                await self.send_message(user_id, message)
+    async def send_message(self, user_id: str, message: Union[WebSocketMessage, Dict[str, Any]]):
+        self.send_text(user_id, self._encode(message))
     
-    async def broadcast_to_all(self, message: WebSocketMessage):
-        disconnected_users = []
-        for user_id in self.active_connections:
-            try:
-                await self.send_message(user_id, message)
-            except Exception:
-                disconnected_users.append(user_id)
+    @staticmethod
+    def _build_message(message_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a plain-dict message with the same shape as WebSocketMessage, skipping model validation"""
+        return {"type": message_type, "data": data, "timestamp": datetime.now(timezone.utc)}
+    
+    @staticmethod
+    def _encode(message: Union[WebSocketMessage, Dict[str, Any], str]) -> str:
+        """Serialize a message to JSON text once so it can be reused for every recipient"""
+        if isinstance(message, str):
+            return message
+        if isinstance(message, WebSocketMessage):
+            return message.model_dump_json()
+        # orjson handles the datetimes and enums found in model_dump() output natively
+        return orjson.dumps(message).decode()
+    
+    async def _broadcast(self, user_ids: List[str], message: Union[WebSocketMessage, Dict[str, Any], str]):
+        """
+        Queue a message for many users without waiting on any socket, dropping users
+        whose send queue is full.
+        
+        The message may be a WebSocketMessage, a plain dict with "type", "data" and
+        "timestamp" keys (see _build_message), or already-serialized JSON text; either
+        way it is serialized at most once.
+        """
+        targets = [user_id for user_id in user_ids if user_id in self.send_queues]
+        if not targets:
+            return
         
-        for user_id in disconnected_users:
+        payload = self._encode(message)
+        for user_id in targets:
+            self.send_text(user_id, payload)
+    
+    def _drop(self, user_id: str, websocket: Optional[WebSocket]):
+        """Forget a socket that failed or fell behind and close it so the client reconnects"""
+        if websocket is None:
+            return
+        # The user may have reconnected on a new socket in the meantime
+        if self.active_connections.get(user_id) is websocket:
             self.disconnect(user_id)
+        asyncio.ensure_future(self._close_quietly(websocket))
+    
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket):
+        try:
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+    
+    async def broadcast_to_subscribers(self, repository_name: str, message: Union[WebSocketMessage, Dict[str, Any]]):
+        user_ids = [
+            user_id for user_id, subscriptions in self.user_subscriptions.items()
+            if repository_name in subscriptions
+        ]
+        await self._broadcast(user_ids, message)
+    
+    async def broadcast_to_team_subscribers(self, team_key: str, message: Union[WebSocketMessage, Dict[str, Any]]):
+        """Send to the team's room plus users that haven't narrowed their updates to specific teams"""
+        user_ids = self.team_rooms.get(team_key, set()) | self.unscoped_users
+        await self._broadcast(list(user_ids), message)
+    
+    async def broadcast_to_all(self, message: Union[WebSocketMessage, Dict[str, Any]]):
+        await self._broadcast(list(self.active_connections), message)
+    
+    async def broadcast_raw(self, payload: str):
+        """Send pre-serialized JSON text to every connected user as-is"""
+        await self._broadcast(list(self.active_connections), payload)
     
     def subscribe_to_repository(self, user_id: str, repository_name: str):
         if user_id not in self.user_subscriptions:
@@ -81,13 +175,25 @@ class WebSocketManager:
         if user_id not in self.user_team_subscriptions:
             self.user_team_subscriptions[user_id] = set()
         self.user_team_subscriptions[user_id].add(team_key)
+        self.team_rooms.setdefault(team_key, set()).add(user_id)
+        self.unscoped_users.discard(user_id)
         logger.info(f"User {user_id} subscribed to team: {team_key}")
     
     def unsubscribe_from_team(self, user_id: str, team_key: str):
         if user_id in self.user_team_subscriptions:
             self.user_team_subscriptions[user_id].discard(team_key)
+            self._leave_room(user_id, team_key)
+            if not self.user_team_subscriptions[user_id] and user_id in self.active_connections:
+                self.unscoped_users.add(user_id)
             logger.info(f"User {user_id} unsubscribed from team: {team_key}")
     
+    def _leave_room(self, user_id: str, team_key: str):
+        room = self.team_rooms.get(team_key)
+        if room is not None:
+            room.discard(user_id)
+            if not room:
+                del self.team_rooms[team_key]
+    
     def get_user_subscriptions(self, user_id: str) -> Set[str]:
         return self.user_subscriptions.get(user_id, set())
     
@@ -101,9 +207,9 @@ class WebSocketManager:
         return user_id in self.active_connections
     
     async def send_pr_update(self, repository_name: str, pr_data: dict, update_type: str):
-        message = WebSocketMessage(
-            type="pr_update",
-            data={
+        message = self._build_message(
+            "pr_update",
+            {
                 "repository": repository_name,
                 "update_type": update_type,
                 "pull_request": pr_data
@@ -112,33 +218,45 @@ class WebSocketManager:
         await self.broadcast_to_subscribers(repository_name, message)
     
     async def send_repository_stats_update(self, repository_name: str, stats: dict):
-        message = WebSocketMessage(
-            type="repository_stats_update",
-            data={
+        message = self._build_message(
+            "repository_stats_update",
+            {
                 "repository": repository_name,
                 "stats": stats
             }
         )
         await self.broadcast_to_subscribers(repository_name, message)
     
-    async def send_team_pr_update(self, team_key: str, pr_data: dict, update_type: str):
-        message = WebSocketMessage(
-            type="team_pr_update",
-            data={
+    def _team_pr_message(self, team_key: str, pr_data: dict, update_type: str) -> Dict[str, Any]:
+        return self._build_message(
+            "team_pr_update",
+            {
                 "team": team_key,
                 "update_type": update_type,
                 "pull_request": pr_data
             }
         )
-        # For now, broadcast to all users since team subscription management isn't implemented
-        # TODO: Implement proper team subscription management in frontend
-        await self.broadcast_to_all(message)
+    
+    async def send_team_pr_update(self, team_key: str, pr_data: dict, update_type: str):
+        await self.broadcast_to_team_subscribers(team_key, self._team_pr_message(team_key, pr_data, update_type))
+    
+    async def send_team_pr_updates(self, team_key: str, updates: List[Tuple[dict, str]]):
+        """Send a team's (pr_data, update_type) updates as one "batch" frame instead of one frame each"""
+        messages = [self._team_pr_message(team_key, pr_data, update_type) for pr_data, update_type in updates]
+        if not messages:
+            return
+        
+        if len(messages) == 1:
+            message = messages[0]
+        else:
+            message = self._build_message("batch", {"messages": messages})
+        await self.broadcast_to_team_subscribers(team_key, message)
     
     async def send_team_stats_update(self, organization: str, team_name: str, stats: dict):
         team_key = f"{organization}/{team_name}"
-        message = WebSocketMessage(
-            type="team_stats_update",
-            data={
+        message = self._build_message(
+            "team_stats_update",
+            {
                 "organization": organization,
                 "team_name": team_name,
                 "stats": stats
@@ -147,9 +265,9 @@ class WebSocketManager:
         await self.broadcast_to_team_subscribers(team_key, message)
     
     async def send_error(self, user_id: str, error_message: str, error_type: str = "general_error"):
-        message = WebSocketMessage(
-            type="error",
-            data={
+        message = self._build_message(
+            "error",
+            {
                 "error_type": error_type,
                 "message": error_message
             }
@@ -34,5 +34,10 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=port,
         reload=is_dev,  # Only enable reload in development
-        log_level="info"
+        log_level="info",
+        # Protocol-level WebSocket keepalive; a peer that misses a pong is disconnected
+        ws_ping_interval=30.0,
+        ws_ping_timeout=10.0,
+        # Clients only send pings and small room commands; reject oversized frames at the protocol level
+        ws_max_size=65536
     )
\ No newline at end of file
@@ -8,7 +8,7 @@ interface TeamRepository {
   assigned_to_user: number;
   review_requests: number;
   from_teams: string[];
-  prs: any[];
+  prs?: any[];  // only with ?include_prs=true
 }
 
 interface UseTeamRepositoriesReturn {
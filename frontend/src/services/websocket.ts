@@ -150,6 +150,11 @@ class WebSocketService {
         console.log('Connection established:', message.data);
         break;
         
+      case 'batch':
+        // Several updates coalesced into one frame by the backend
+        message.data.messages.forEach((batched: WebSocketMessage) => this.handleMessage(batched));
+        break;
+        
       case 'pr_update':
         const prUpdateData = message as PRUpdateMessage;
         this.eventHandlers.onPRUpdate?.(prUpdateData.data);